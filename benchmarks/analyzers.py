@@ -0,0 +1,64 @@
+# Standard library
+import random
+import time
+
+# Third party libraries
+from tracers.analyzers import analyze_stack
+from tracers.contextvars import LOGGER
+from tracers.recorder import EVENT_CALL, EVENT_RETURN, Recorder
+from tracers.registry import register_function_name
+
+# Constants
+FUNCTIONS = tuple(
+    register_function_name(f'function_{index}') for index in range(32)
+)
+MAX_LEVEL = 64
+
+
+def synthetic_stack(frames: int) -> Recorder:
+    # A random tree mixing deep and wide call chains
+    generator = random.Random(frames)
+    recorder = Recorder()
+    open_calls = []
+    timestamp = recorder.epoch
+
+    while len(recorder) + len(open_calls) < frames:
+        timestamp += generator.randrange(10 ** 9)
+        if open_calls and (
+            len(open_calls) == MAX_LEVEL or generator.random() < 0.5
+        ):
+            recorder.record(
+                EVENT_RETURN, open_calls.pop(), len(open_calls) + 1, timestamp,
+            )
+        else:
+            function = generator.choice(FUNCTIONS)
+            open_calls.append(function)
+            recorder.record(EVENT_CALL, function, len(open_calls), timestamp)
+
+    while open_calls:
+        timestamp += generator.randrange(10 ** 9)
+        recorder.record(
+            EVENT_RETURN, open_calls.pop(), len(open_calls) + 1, timestamp,
+        )
+
+    return recorder
+
+
+def main():
+    # Measure the analysis, not the logging handlers
+    LOGGER.set(None)
+
+    print('  Frames         Total    Cost per frame')
+    for frames in (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6):
+        stack = synthetic_stack(frames)
+
+        start = time.perf_counter()
+        analyze_stack(stack)
+        end = time.perf_counter()
+
+        print(f'{frames:>8}  {end - start:>10.3f}s  '
+              f'{1e9 * (end - start) / frames:>12.1f}ns')
+
+
+if __name__ == '__main__':
+    main()
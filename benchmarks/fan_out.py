@@ -0,0 +1,62 @@
+# Standard library
+import asyncio
+import time
+
+# Third party libraries
+from tracers.function import trace
+from tracers.sampling import Sampler
+
+# Constants
+ROOTS = 200
+# Tasks that every root spawns and awaits, each of them records into a
+#   branch of its own
+TASKS = (10, 100, 1000)
+
+
+def fan_out(*, tasks: int, traced: bool):
+    decorator = trace(log_to=None, sampler=Sampler())
+
+    async def child():
+        await asyncio.sleep(0)
+
+    if traced:
+        child = decorator(child)
+
+    @decorator
+    async def root():
+        await asyncio.gather(*[child() for _ in range(tasks)])
+
+    return root
+
+
+async def measure(root, tasks: int) -> float:
+    # The first round warms up the loop and the tracers
+    await root()
+
+    start = time.perf_counter()
+    for _ in range(ROOTS):
+        await root()
+    end = time.perf_counter()
+
+    return 1e9 * (end - start) / ROOTS / tasks
+
+
+async def main():
+    print('  Mode                    ' + ''.join(
+        f'    Tasks {tasks:<4}' for tasks in TASKS
+    ))
+    for mode, traced in (
+        ('plain tasks', False),
+        ('traced tasks', True),
+    ):
+        costs = [
+            await measure(fan_out(tasks=tasks, traced=traced), tasks)
+            for tasks in TASKS
+        ]
+        print(f'  {mode:<20}    ' + ''.join(
+            f'{cost:>12.1f}ns' for cost in costs
+        ))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
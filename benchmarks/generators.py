@@ -0,0 +1,70 @@
+# Standard library
+import time
+
+# Third party libraries
+from tracers.function import trace
+from tracers.recorder import EVENT_CALL, EVENT_RETURN, Recorder
+from tracers.sampling import Sampler
+
+# Constants
+ROOTS = 200
+# Items that every generator yields, resumes are folded into a single frame
+#   so the recorder does not grow with them
+ITEMS = (10, 100, 1000)
+
+
+def stream(*, items: int, traced: bool):
+    decorator = trace(log_to=None, sampler=Sampler())
+
+    def generator():
+        yield from range(items)
+
+    if traced:
+        generator = decorator(generator)
+
+    @decorator
+    def root():
+        for _ in generator():
+            pass
+
+    return root
+
+
+def measure(root, items: int) -> float:
+    start = time.perf_counter()
+    for _ in range(ROOTS):
+        root()
+    end = time.perf_counter()
+
+    return 1e9 * (end - start) / ROOTS / items
+
+
+def main():
+    print('  Mode                    ' + ''.join(
+        f'    Items {items:<4}' for items in ITEMS
+    ))
+    for mode, traced in (
+        ('plain generator', False),
+        ('traced generator', True),
+    ):
+        costs = [
+            measure(stream(items=items, traced=traced), items)
+            for items in ITEMS
+        ]
+        print(f'  {mode:<20}    ' + ''.join(
+            f'{cost:>12.1f}ns' for cost in costs
+        ))
+
+    # Events kept for a generator resumed a thousand times by a root,
+    #   the first resume is the call event at index 1
+    recorder: Recorder = Recorder()
+    recorder.record(EVENT_CALL, 0, 1, 0)
+    for index in range(1000):
+        recorder.record(EVENT_CALL, 1, 2, 0, 0, 1 if index else -1)
+        recorder.record(EVENT_RETURN, 1, 2, 0, 0, 1)
+    recorder.record(EVENT_RETURN, 0, 1, 0)
+    print(f'  Events kept for 1000 items: {len(recorder)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# Standard library
+import time
+
+# Third party libraries
+from tracers.function import call, span, trace
+from tracers.sampling import Sampler
+
+# Constants
+CALLS = 1000
+ROOTS = 200
+
+
+def function():
+    pass
+
+
+def rebuilt():
+    # What call() used to do: build the wrapper on every call
+    for _ in range(CALLS):
+        trace()(function)()
+
+
+def cached():
+    for _ in range(CALLS):
+        call(function)
+
+
+def spanned():
+    for _ in range(CALLS):
+        with span('block'):
+            function()
+
+
+def measure(body) -> float:
+    # A traced root so the inline calls are recorded
+    root = trace(log_to=None, sampler=Sampler())(body)
+
+    start = time.perf_counter()
+    for _ in range(ROOTS):
+        root()
+    end = time.perf_counter()
+
+    return 1e9 * (end - start) / (ROOTS * CALLS)
+
+
+def main():
+    print('  Case                      Cost per call')
+    for case, body in (
+        ('call(), rebuilt wrapper', rebuilt),
+        ('call(), cached wrapper', cached),
+        ('span()', spanned),
+    ):
+        print(f'  {case:<24}    {measure(body):>11.1f}ns')
+
+
+if __name__ == '__main__':
+    main()
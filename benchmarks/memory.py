@@ -0,0 +1,67 @@
+# Standard library
+import time
+import tracemalloc
+
+# Third party libraries
+from tracers.function import trace
+from tracers.sampling import Sampler
+
+# Constants
+ROOTS = 2000
+# Objects that every traced call allocates, the cost of tracemalloc grows
+#   with the allocations of the process, the cost of the frames does not
+ALLOCATIONS = (0, 10, 100)
+
+
+def chain(*, allocations: int, memory: bool):
+    decorator = trace(log_to=None, memory=memory, sampler=Sampler())
+
+    @decorator
+    def leaf():
+        return [[] for _ in range(allocations)]
+
+    @decorator
+    def node():
+        leaf()
+        leaf()
+
+    @decorator
+    def root():
+        node()
+        node()
+
+    return root
+
+
+def measure(root) -> float:
+    start = time.perf_counter()
+    for _ in range(ROOTS):
+        root()
+    end = time.perf_counter()
+
+    return 1e9 * (end - start) / ROOTS
+
+
+def main():
+    print('  Mode                    ' + ''.join(
+        f'    Allocs {allocations:<3}' for allocations in ALLOCATIONS
+    ))
+    for mode, tracing, memory in (
+        ('traced', False, False),
+        ('tracemalloc started', True, False),
+        ('memory=True', True, True),
+    ):
+        if tracing:
+            tracemalloc.start()
+
+        costs = [
+            measure(chain(allocations=allocations, memory=memory))
+            for allocations in ALLOCATIONS
+        ]
+        print(f'  {mode:<20}    ' + ''.join(
+            f'{cost:>12.1f}ns' for cost in costs
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# Standard library
+import time
+
+# Third party libraries
+from tracers.recorder import EVENT_CALL, EVENT_RETURN, Recorder
+from tracers.registry import register_function
+from tracers.utils import get_monotonic_time_ns
+
+
+def function_a():
+    pass
+
+
+def function_b():
+    pass
+
+
+def measure(events: int, *, repeated: bool):
+    # Events are recorded the way the wrappers do, under a root frame
+    recorder: Recorder = Recorder()
+    recorder.record(EVENT_CALL, 0, 1, get_monotonic_time_ns())
+
+    # Consecutive calls to the same function are collapsed by the recorder
+    functions = tuple(map(register_function, (
+        (function_a, function_a) if repeated else (function_a, function_b)
+    )))
+
+    start = time.perf_counter()
+    for index in range(events // 2):
+        function_id = functions[index % 2]
+        recorder.record(EVENT_CALL, function_id, 2, get_monotonic_time_ns())
+        recorder.record(
+            EVENT_RETURN, function_id, 2, get_monotonic_time_ns(), 0,
+        )
+    end = time.perf_counter()
+
+    return 1e9 * (end - start) / events, len(recorder)
+
+
+def main():
+    print('  Events    Calls      Cost per event    Frames kept')
+    for repeated in (False, True):
+        for events in (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6):
+            cost, frames = measure(events, repeated=repeated)
+            print(f'{events:>8}    {"equal" if repeated else "mixed":>5}'
+                  f'    {cost:>14.1f}ns    {frames:>11}')
+
+
+if __name__ == '__main__':
+    main()
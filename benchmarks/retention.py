@@ -0,0 +1,70 @@
+# Standard library
+import random
+import time
+
+# Third party libraries
+from tracers.containers import DaemonResult
+from tracers.recorder import EVENT_CALL, EVENT_RETURN, Recorder
+from tracers.registry import register_function_name
+from tracers.retention import Retention
+from tracers.uploads import encode_transactions
+
+# Constants
+INITIATORS = tuple(
+    register_function_name(f'server.api.module_{index}.endpoint_{index}')
+    for index in range(10)
+)
+FRAMES = 200
+TRANSACTIONS = 90000
+# A second worth of transactions of a 3k rps API
+FLUSH_EVERY = 3000
+
+
+def synthetic_result(initiator: int, total_time: int) -> DaemonResult:
+    recorder = Recorder()
+    for index in range(FRAMES // 2):
+        timestamp = recorder.epoch + total_time * index // (FRAMES // 2)
+        recorder.record(EVENT_CALL, initiator, 1, timestamp)
+        recorder.record(EVENT_RETURN, initiator, 1, timestamp)
+    recorder.record(EVENT_RETURN, initiator, 1, recorder.epoch + total_time)
+
+    return DaemonResult(skews=(), stack=recorder, stalls=())
+
+
+def measure(quantile: float):
+    random.seed(0)
+    retention = Retention(quantile=quantile)
+    results = [
+        synthetic_result(
+            random.choice(INITIATORS),
+            round(1e9 * random.lognormvariate(-4.0, 0.5)),
+        )
+        for _ in range(FLUSH_EVERY)
+    ]
+
+    kept, uploaded_bytes, seconds = 0, 0, 0.0
+    for _ in range(TRANSACTIONS // FLUSH_EVERY):
+        start = time.perf_counter()
+        batch = tuple(filter(retention.keep, results))
+        seconds += time.perf_counter() - start
+
+        extremes, summaries = retention.flush()
+        batch += extremes
+
+        _, transactions, summaries = encode_transactions(batch, summaries)
+        kept += len(batch)
+        uploaded_bytes += sum(map(len, map(str, transactions + summaries)))
+
+    return kept, uploaded_bytes, 1e9 * seconds / TRANSACTIONS
+
+
+def main():
+    print('  Quantile          Kept      Uploaded    Cost per transaction')
+    for quantile in (0.0, 0.9, 0.99, 0.999):
+        kept, uploaded_bytes, cost = measure(quantile)
+        print(f'  {quantile:>8}    {kept:>10}    {uploaded_bytes:>10}'
+              f'    {cost:>18.1f}ns')
+
+
+if __name__ == '__main__':
+    main()
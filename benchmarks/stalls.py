@@ -0,0 +1,52 @@
+# Standard library
+import asyncio
+import time
+
+# Third party libraries
+from tracers.function import trace
+from tracers.loop import enable_stall_detector
+from tracers.sampling import Sampler
+
+# Constants
+CALLBACKS = 100000
+# Callbacks run while some transaction on the loop is being traced
+MODES = {
+    'off': 0.0,
+    'on, below threshold': 1.0,
+    'on, all stalls': 1e-9,
+}
+
+
+def callback():
+    pass
+
+
+async def run_callbacks() -> float:
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+
+    def last():
+        done.set_result(time.perf_counter())
+
+    start = time.perf_counter()
+    for _ in range(CALLBACKS):
+        loop.call_soon(callback)
+    loop.call_soon(last)
+    end = await done
+
+    return 1e9 * (end - start) / CALLBACKS
+
+
+def main():
+    root = trace(log_to=None, sampler=Sampler())(run_callbacks)
+
+    print('  Stall detector               Cost per callback')
+    for mode, threshold in MODES.items():
+        enable_stall_detector(threshold=threshold)
+        cost = min(asyncio.run(root()) for _ in range(5))
+        print(f'  {mode:<24}    {cost:>17.1f}ns')
+    enable_stall_detector(threshold=0.0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# Standard library
+import statistics
+import subprocess
+import sys
+
+# Runs in a fresh interpreter so nothing is cached in sys.modules
+PROBE = """
+import sys
+import threading
+import time
+
+start = time.perf_counter()
+{statement}
+end = time.perf_counter()
+
+print(
+    end - start,
+    'aiohttp' in sys.modules,
+    sum(thread.name.startswith('Tracers') for thread in threading.enumerate()),
+)
+"""
+
+
+def measure(statement: str, samples: int = 10):
+    timings = []
+    for _ in range(samples):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE.format(statement=statement)],
+            check=True,
+            stdout=subprocess.PIPE,
+        ).stdout.decode().split()
+        timings.append(float(output[0]))
+
+    return statistics.median(timings), output[1], output[2]
+
+
+def main():
+    print('  Statement                Import time   Network stack   Threads')
+    for statement in (
+        'pass',
+        'import tracers.function',
+    ):
+        seconds, network, threads = measure(statement)
+        print(f'  {statement:<23} {1e3 * seconds:>9.1f}ms  '
+              f'{network:>13}   {threads:>7}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# Standard library
+import asyncio
+import json
+import time
+
+# Third party libraries
+import aiohttp
+import aiohttp.web
+from tracers.containers import DaemonResult
+from tracers.graphql import GraphQLClient
+from tracers.recorder import EVENT_CALL, EVENT_RETURN, Recorder
+from tracers.registry import register_function_name
+from tracers.uploads import encode_transactions
+
+# Constants
+FUNCTIONS = tuple(
+    register_function_name(f'server.domain.module_{index}.function_{index}')
+    for index in range(32)
+)
+REQUESTS = 200
+
+
+def synthetic_results(transactions: int, frames: int) -> tuple:
+    results = []
+    for transaction in range(transactions):
+        recorder = Recorder()
+        for index in range(frames // 2):
+            function = FUNCTIONS[(transaction + index) % len(FUNCTIONS)]
+            timestamp = recorder.epoch + 1000000 * index
+            recorder.record(EVENT_CALL, function, 1, timestamp)
+            recorder.record(EVENT_RETURN, function, 1, timestamp + 500000)
+        results.append(DaemonResult(skews=(), stack=recorder, stalls=()))
+
+    return tuple(results)
+
+
+class StandInServer:
+
+    def __init__(self):
+        self.bytes_received = 0
+
+    async def handle(self, request):
+        # aiohttp decodes the content-encoding of the request by itself
+        self.bytes_received += request.content_length
+        json.loads(await request.read())
+
+        return aiohttp.web.json_response({'data': {}})
+
+
+async def one_shot_client(endpoint: str, payload: dict) -> None:
+    # What the SDK used to do: a new session per request, uncompressed
+    async with aiohttp.ClientSession() as session:
+        async with session.post(endpoint, json=payload) as response:
+            await response.json()
+
+
+async def main():
+    server = StandInServer()
+    application = aiohttp.web.Application()
+    application.router.add_post('/api', server.handle)
+    runner = aiohttp.web.AppRunner(application)
+    await runner.setup()
+    site = aiohttp.web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    endpoint = f'http://127.0.0.1:{port}/api'
+
+    functions, transactions, _ = \
+        encode_transactions(synthetic_results(10, 200))
+    variables = {'functions': functions, 'transactions': transactions}
+    payload = {'query': 'mutation { putTransactions }', 'variables': variables}
+
+    print('  Client                  Requests/s    Bytes/request')
+
+    server.bytes_received = 0
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await one_shot_client(endpoint, payload)
+    elapsed = time.perf_counter() - start
+    print(f'  One-shot, identity    {REQUESTS / elapsed:>12.1f}'
+          f'    {server.bytes_received // REQUESTS:>13}')
+
+    for compression in ('identity', 'gzip'):
+        client = GraphQLClient(
+            compression=compression,
+            connections=4,
+            endpoint=endpoint,
+            headers={},
+        )
+        server.bytes_received = 0
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            await client.execute(query=payload['query'], variables=variables)
+        elapsed = time.perf_counter() - start
+        await client.close()
+        print(f'  Pooled, {compression:<12}  {REQUESTS / elapsed:>12.1f}'
+              f'    {server.bytes_received // REQUESTS:>13}')
+
+    await runner.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
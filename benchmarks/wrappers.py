@@ -0,0 +1,93 @@
+# Standard library
+import asyncio
+import time
+
+# Third party libraries
+from tracers.function import trace
+from tracers.sampling import ProbabilitySampler, Sampler
+
+# Constants
+DEPTHS = (1, 4, 16)
+ROOTS = 2000
+MODES = {
+    'bare': lambda function: function,
+    'disabled': trace(enabled=False),
+    'unsampled': trace(
+        log_to=None,
+        sampler=ProbabilitySampler(probability=0.0),
+    ),
+    'traced': trace(log_to=None, sampler=Sampler()),
+    'cpu time': trace(cpu_time=True, log_to=None, sampler=Sampler()),
+    'suspended': trace(log_to=None, sampler=Sampler(), suspended_time=True),
+}
+
+
+def sync_chain(decorator, depth: int):
+    def leaf():
+        pass
+
+    function = decorator(leaf)
+    for _ in range(depth - 1):
+        def node(child=function):
+            child()
+
+        function = decorator(node)
+
+    return function
+
+
+def async_chain(decorator, depth: int):
+    async def leaf():
+        pass
+
+    function = decorator(leaf)
+    for _ in range(depth - 1):
+        async def node(child=function):
+            await child()
+
+        function = decorator(node)
+
+    return function
+
+
+def measure_sync(decorator, depth: int) -> float:
+    root = sync_chain(decorator, depth)
+
+    start = time.perf_counter()
+    for _ in range(ROOTS):
+        root()
+    end = time.perf_counter()
+
+    return 1e9 * (end - start) / (ROOTS * depth)
+
+
+async def measure_async(decorator, depth: int) -> float:
+    root = async_chain(decorator, depth)
+
+    start = time.perf_counter()
+    for _ in range(ROOTS):
+        await root()
+    end = time.perf_counter()
+
+    return 1e9 * (end - start) / (ROOTS * depth)
+
+
+def main():
+    print('  Kind     Mode          ' + ''.join(
+        f'    Depth {depth:<3}' for depth in DEPTHS
+    ))
+    for kind in ('sync', 'async'):
+        for mode, decorator in MODES.items():
+            costs = [
+                measure_sync(decorator, depth)
+                if kind == 'sync' else
+                asyncio.run(measure_async(decorator, depth))
+                for depth in DEPTHS
+            ]
+            print(f'  {kind:<5}    {mode:<10}    ' + ''.join(
+                f'{cost:>11.1f}ns' for cost in costs
+            ))
+
+
+if __name__ == '__main__':
+    main()
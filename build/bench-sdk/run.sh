@@ -0,0 +1,18 @@
+#! /usr/bin/env bash
+
+source 'build/include/generic/shell-options.sh'
+
+function main {
+      echo '[INFO] Benchmarking the SDK' \
+  && pushd sdk \
+    &&  for benchmark in ../benchmarks/*.py
+        do
+              echo "[INFO] Running benchmark: ${benchmark}" \
+          &&  poetry run python "${benchmark}" \
+          ||  return 1
+        done \
+  &&  popd \
+  ||  return 1
+}
+
+main
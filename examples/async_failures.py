@@ -0,0 +1,45 @@
+# Local libraries
+import asyncio
+
+# Third party libraries
+from tracers.function import trace
+
+
+# Frames that raise or that are cancelled are closed as well,
+#   and their times are summarized apart from the ones that returned
+@trace()
+async def function_a():
+    await function_b(0.1)
+
+    try:
+        await function_c()
+    except ValueError:
+        pass
+
+    await function_b(1.0)
+
+
+@trace()
+async def function_b(seconds: float):
+    await asyncio.sleep(seconds)
+
+
+@trace()
+async def function_c():
+    await asyncio.sleep(0.1)
+    raise ValueError('Invalid report')
+
+
+async def main():
+    task = asyncio.ensure_future(function_a())
+    await asyncio.sleep(0.3)
+    task.cancel()
+
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,29 @@
+# Local libraries
+import asyncio
+
+# Third party libraries
+from tracers.function import trace
+
+
+# Tasks spawned inside a transaction are part of it, they are rendered
+#   under the frame that spawned them, and the frames that spawned tasks
+#   are summarized with how many of them ran at once
+@trace(suspended_time=True)
+async def function_a():
+    await asyncio.gather(*[function_b(delay) for delay in (0.1, 0.2, 0.3)])
+    await asyncio.create_task(function_c())
+
+
+@trace()
+async def function_b(delay: float):
+    await asyncio.sleep(delay)
+    await function_c()
+
+
+@trace()
+async def function_c():
+    await asyncio.sleep(0.1)
+
+
+if __name__ == '__main__':
+    asyncio.run(function_a())
@@ -0,0 +1,26 @@
+# Local libraries
+import asyncio
+import time
+
+# Third party libraries
+from tracers.function import trace
+from tracers.loop import enable_stall_detector
+
+
+# A third party callback that nobody traced
+def untraced_callback():
+    time.sleep(0.2)
+
+
+# The same as exporting TRACERS_STALL_THRESHOLD=0.05
+enable_stall_detector(threshold=0.05)
+
+
+@trace()
+async def function_a():
+    asyncio.get_running_loop().call_soon(untraced_callback)
+    await asyncio.sleep(0.3)
+
+
+if __name__ == '__main__':
+    asyncio.run(function_a())
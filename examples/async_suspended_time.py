@@ -0,0 +1,30 @@
+# Local libraries
+import asyncio
+import time
+
+# Third party libraries
+from tracers.function import trace
+
+
+# The time that every frame ran on the loop is told apart from the time
+#   it was suspended, awaiting while other tasks ran
+@trace(suspended_time=True)
+async def function_a():
+    await function_b()
+    await function_c()
+
+
+# Holds the loop, nothing else can run meanwhile
+@trace()
+async def function_b():
+    time.sleep(0.1)
+
+
+# Awaits, other tasks can run meanwhile
+@trace()
+async def function_c():
+    await asyncio.sleep(0.1)
+
+
+if __name__ == '__main__':
+    asyncio.run(function_a())
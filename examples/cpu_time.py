@@ -0,0 +1,24 @@
+# Local libraries
+import time
+
+# Third party libraries
+from tracers.function import call, trace
+
+
+# The CPU time of the thread is recorded next to the wall time,
+#   so it's possible to tell burning CPU from waiting for something else
+@trace(cpu_time=True)
+def function_a():
+    function_b()
+    call(time.sleep, 0.1)
+
+
+@trace()
+def function_b():
+    start = time.perf_counter()
+    while time.perf_counter() - start < 0.1:
+        pass
+
+
+if __name__ == '__main__':
+    function_a()
@@ -0,0 +1,43 @@
+# Local libraries
+import time
+
+# Third party libraries
+from tracers.function import trace
+
+
+# Calls to function_c under its min_duration are summarized in a bucket
+#   of their parent, and consecutive calls to function_b, with their
+#   buckets, are collapsed into a single frame. function_e is fast too, but
+#   it's kept as a frame so its bucket is not lost
+@trace()
+def function_a():
+    for _ in range(3):
+        function_b()
+    function_e()
+    function_d()
+
+
+@trace()
+def function_b():
+    for _ in range(2):
+        function_c()
+
+
+@trace(min_duration=0.01)
+def function_c():
+    time.sleep(0.001)
+
+
+@trace()
+def function_d():
+    time.sleep(0.01)
+
+
+@trace(min_duration=0.1)
+def function_e():
+    for _ in range(2):
+        function_c()
+
+
+if __name__ == '__main__':
+    function_a()
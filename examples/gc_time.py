@@ -0,0 +1,30 @@
+# Local libraries
+import gc
+
+# Third party libraries
+from tracers.function import trace
+
+
+# Pauses of the garbage collector are recorded too, and charged to the
+#   innermost frame that was running when they happened
+@trace(gc_time=True)
+def function_a():
+    function_b()
+    function_c()
+
+
+# Allocates a lot of short lived cycles
+@trace()
+def function_b():
+    for _ in range(500000):
+        cycle = []
+        cycle.append(cycle)
+
+
+@trace()
+def function_c():
+    gc.collect()
+
+
+if __name__ == '__main__':
+    function_a()
@@ -0,0 +1,41 @@
+# Local libraries
+import asyncio
+import time
+
+# Third party libraries
+from tracers.function import trace
+
+
+# Generators are timed while they produce their items, not when they are
+#   created, and each one is rendered as a single frame
+@trace()
+async def function_a():
+    for _ in function_b():
+        time.sleep(0.05)
+
+    async for _ in function_c():
+        await asyncio.sleep(0.05)
+
+
+@trace()
+def function_b():
+    for item in range(3):
+        time.sleep(0.1)
+        yield item
+
+
+@trace()
+async def function_c():
+    for item in range(3):
+        await asyncio.sleep(0.1)
+        yield function_d(item)
+
+
+@trace()
+def function_d(item: int) -> int:
+    time.sleep(0.1)
+    return item
+
+
+if __name__ == '__main__':
+    asyncio.run(function_a())
@@ -0,0 +1,28 @@
+# Third party libraries
+from tracers.function import trace
+
+
+# The bytes traced by tracemalloc are recorded next to the time,
+#   so it's possible to tell the frames that keep memory from the ones
+#   that only use it for a while
+@trace(memory=True)
+def function_a():
+    report = function_b()
+    function_c()
+    return report
+
+
+# Keeps what it allocates
+@trace()
+def function_b():
+    return [str(number) for number in range(100000)]
+
+
+# Releases what it allocates
+@trace()
+def function_c():
+    return len([str(number) for number in range(200000)])
+
+
+if __name__ == '__main__':
+    function_a()
@@ -1,18 +1,28 @@
 # Standard library
+from bisect import (
+    bisect_left,
+    bisect_right,
+)
 from itertools import groupby
 from operator import (
     attrgetter,
-    itemgetter,
 )
 from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
     NamedTuple,
+    Optional,
+    Sequence,
+    Set,
     Tuple,
 )
 
 # Local libraries
 from tracers.containers import (
-    Frame,
     LoopSnapshot,
+    LoopStall,
 )
 from tracers.constants import (
     CHAR_BROKEN_BAR,
@@ -20,41 +30,140 @@ from tracers.constants import (
     CHAR_INFO,
     CHAR_SPACE,
     CHAR_SUPERSCRIPT_ONE,
-    LOOP_SKEW_TOLERANCE,
+)
+from tracers.loop import (
+    is_skew,
+)
+from tracers.recorder import (
+    AGGREGATE_COUNT,
+    AGGREGATE_SUM,
+    BUCKET_CPU,
+    BUCKET_MEMORY,
+    BUCKET_SUSPENDED,
+    COLLECTION_DURATION,
+    COLLECTION_FUNCTION,
+    COLLECTION_SIZE,
+    EVENT_CALL,
+    EVENT_CANCEL,
+    EVENT_EXCEPTION,
+    GENERATOR_ITEMS,
+    GENERATOR_LIFETIME,
+    GENERATOR_PARENT,
+    Recorder,
+)
+from tracers.registry import (
+    get_function_name,
 )
 from tracers.utils import (
-    delta,
     divide,
     log,
     on_error,
+    to_seconds,
 )
 
+# Columns added when the CPU time, the suspended time or the traced memory
+#   were recorded
+CPU_HEADER: str = '   Net CPU Total CPU CPU/Wall'
+LOOP_HEADER: str = '  Net Loop      Loop Suspended'
+MEMORY_HEADER: str = '   Net Mem Total Mem  Peak Mem'
+
 Result = NamedTuple('Result', [
+    # Fast calls summarized by this result, by function
+    ('bucket', Optional[Dict[int, List[int]]]),
+    ('count', int),
     ('counter', int),
+    # Rendered after the function in the call chain only
+    ('details', str),
     ('function', str),
     ('indentation', str),
     ('level', int),
+    # CPU times, suspended times and bytes of memory are None unless they
+    #   were recorded, the peak is None for summarized fast calls too
+    ('net_cpu_seconds', Optional[float]),
+    ('net_memory', Optional[int]),
+    ('net_suspended_seconds', Optional[float]),
     ('net_time_ratio', float),
     ('net_time_seconds', float),
+    ('peak_memory', Optional[int]),
+    ('raw_cpu_seconds', Optional[float]),
+    ('raw_memory', Optional[int]),
+    ('raw_suspended_seconds', Optional[float]),
     ('raw_time_ratio', float),
     ('raw_time_seconds', float),
     ('relative_timestamp', float),
 ])
 
 
+@on_error(of_type=Exception, return_value=None)
+def analyze_collections(
+    stack: Recorder,
+) -> None:
+    collections: Dict[int, List[int]] = get_collections(stack)
+
+    if collections:
+        log()
+        log('  Garbage collections paused the transaction for',
+            f'{to_seconds(stack.get_collections_time()):.2f} seconds')
+        log()
+        log('     Collections    Paused    Function')
+        log()
+        for function_id, (count, paused) in sorted(
+            collections.items(),
+            key=lambda item: -item[1][1],
+        ):
+            log(f'{count:>16}',
+                f'{to_seconds(paused):>8.2f}s',
+                f'{3 * CHAR_SPACE + CHAR_CHECK_MARK}',
+                f'{get_function_name(function_id)}')
+
+
+@on_error(of_type=Exception, return_value=None)
+def analyze_fan_outs(
+    stack: Recorder,
+) -> None:
+    fan_outs: List[Tuple[int, int, int, int]] = get_fan_outs(stack)
+
+    if fan_outs:
+        log()
+        log('  Some frames spawned tasks that ran concurrently')
+        log()
+        log('           Tasks      Wall      Busy Parallelism    Function')
+        log()
+        for function_id, tasks, wall, busy in sorted(
+            fan_outs,
+            key=lambda fan_out: -fan_out[2],
+        ):
+            parallelism: float = divide(
+                numerator=busy,
+                denominator=wall,
+                on_zero_denominator=1.0,
+            )
+
+            log(f'{tasks:>16}',
+                f'{to_seconds(wall):>8.2f}s',
+                f'{to_seconds(busy):>8.2f}s',
+                f'{parallelism:>10.2f}x',
+                f'{3 * CHAR_SPACE + CHAR_CHECK_MARK}',
+                f'{get_function_name(function_id)}')
+
+
 @on_error(of_type=Exception, return_value=None)
 def analyze_loop_snapshots(
     snapshots: Tuple[LoopSnapshot, ...],
+    stack: Recorder,
+    stalls: Tuple[LoopStall, ...] = (),
 ) -> None:
+    initial_timestamp: int = stack.epoch + stack.timestamps[0]
     top_snapshots: Tuple[LoopSnapshot, ...] = tuple(sorted(
-        [
-            snapshot
-            for snapshot in snapshots
-            if snapshot.block_duration_ratio > 1.0 + LOOP_SKEW_TOLERANCE
-        ],
+        filter(is_skew, snapshots),
         key=attrgetter('real_tick_duration'),
         reverse=True,
     ))
+    top_stalls: Tuple[LoopStall, ...] = tuple(sorted(
+        stalls,
+        key=attrgetter('duration'),
+        reverse=True,
+    ))
 
     if top_snapshots:
         log()
@@ -63,157 +172,947 @@ def analyze_loop_snapshots(
         log()
         log('  #    Timestamp     Delay')
         log()
-        initial_timestamp: float = snapshots[0].timestamp
         for counter, snapshot in enumerate(top_snapshots):
-            skew: float = delta(
-                snapshot.wanted_tick_duration,
-                snapshot.real_tick_duration,
-            )
+            skew: int = \
+                snapshot.real_tick_duration - snapshot.wanted_tick_duration
+            # The tick may have been scheduled before the transaction started
+            timestamp: int = max(0, snapshot.timestamp - initial_timestamp)
+
+            log(f'{counter:>6}',
+                f'{to_seconds(timestamp):>8.2f}s',
+                f'{to_seconds(skew):>8.2f}s')
+        log()
+        log('           Skews   Blocked    Function')
+        log()
+        for function_id, (skews, blocked) in sorted(
+            get_blocking_culprits(stack, top_snapshots).items(),
+            key=lambda item: -item[1][1],
+        ):
+            log(f'{skews:>16}',
+                f'{to_seconds(blocked):>8.2f}s',
+                f'{3 * CHAR_SPACE + CHAR_CHECK_MARK}',
+                f'{get_function_name(function_id)}')
+
+    if top_stalls:
+        log()
+        log('  Some callbacks held the event loop for too long',
+            CHAR_SUPERSCRIPT_ONE)
+        log()
+        log('  #    Timestamp  Duration    Callback')
+        log()
+        for counter, stall in enumerate(top_stalls):
+            timestamp = max(0, stall.timestamp - initial_timestamp)
 
             log(f'{counter:>6}',
-                f'{delta(initial_timestamp, snapshot.timestamp):>8.2f}s',
-                f'{skew:>8.2f}s')
+                f'{to_seconds(timestamp):>8.2f}s',
+                f'{to_seconds(stall.duration):>8.2f}s',
+                f'{3 * CHAR_SPACE + CHAR_CHECK_MARK}',
+                f'{stall.callback}',
+                *((f'({stall.filename}:{stall.line})',)
+                  if stall.filename else ()))
+
+    if top_snapshots or top_stalls:
         log()
         log(f'  {CHAR_SUPERSCRIPT_ONE}',
             'Consider reviewing them carefully',
             'to improve the overall system throughput')
 
 
-@on_error(of_type=Exception, return_value=None)
-def analyze_stack(  # pylint: disable=too-many-locals
-    stack: Tuple[Frame, ...],
-) -> None:
-    stack_levels: Tuple[int, ...] = \
-        tuple(map(attrgetter('level'), stack))
+def get_blocking_culprits(
+    stack: Recorder,
+    skews: Sequence[LoopSnapshot],
+) -> Dict[int, List[int]]:
+    # function -> [skews, blocked nanoseconds]
+    #   A skew is blamed on the innermost frame that was open for most of the
+    #   time the loop was blocked, that is, between the moment the monitor
+    #   wanted to run and the moment it ran. A frame that was awaiting while
+    #   another task blocked the loop is blamed too, unless some task of the
+    #   transaction recorded events meanwhile: only that one was running
+    culprits: Dict[int, List[int]] = {}
+    # window -> task -> function -> nanoseconds the function was on top
+    overlaps: Dict[int, Dict[int, Dict[int, int]]] = {}
+    # window -> tasks that recorded events in it
+    running: Dict[int, Set[int]] = {}
+    windows: List[Tuple[int, int]] = sorted(
+        (
+            skew.timestamp + skew.wanted_tick_duration - stack.epoch,
+            skew.timestamp + skew.real_tick_duration - stack.epoch,
+        )
+        for skew in skews
+    )
+    # Ticks of the monitor do not overlap, ends are sorted too
+    windows_ends: List[int] = [window_end for _, window_end in windows]
 
-    total_time_seconds: float = \
-        delta(stack[0].timestamp, stack[-1].timestamp)
+    if not windows:
+        return culprits
 
-    log()
-    log(f'{CHAR_INFO} Finished transaction: {total_time_seconds:.2f} seconds')
-    log()
-    log('     # Timestamp                Net              Total    Call Chain')
-    log()
+    for task_stack in get_stacks(stack):
+        # Timestamps grow, so it jumps from window to window with the
+        #   events that fall in them, instead of looking at every window
+        timestamps = task_stack.timestamps
+        position: int = 0
+        while position < len(timestamps):
+            current: int = bisect_right(windows_ends, timestamps[position])
+            if current == len(windows):
+                break
+
+            window_start, window_end = windows[current]
+            if window_start < timestamps[position]:
+                running.setdefault(current, set()).add(task_stack.task)
+                position = bisect_left(timestamps, window_end, position)
+            else:
+                position = bisect_right(timestamps, window_start, position)
+
+    for start, end, owner, task in get_segments(stack):
+        for current in range(
+            bisect_right(windows_ends, start), len(windows),
+        ):
+            window_start, window_end = windows[current]
+            if window_start >= end:
+                break
+
+            overlap: int = min(end, window_end) - max(start, window_start)
+            if overlap > 0:
+                owners = overlaps.setdefault(current, {}).setdefault(task, {})
+                owners[owner] = owners.get(owner, 0) + overlap
+
+    for current, tasks in overlaps.items():
+        window_start, window_end = windows[current]
+        candidates: Dict[int, int] = {}
+        for task in running.get(current, set()).intersection(tasks) \
+                or tasks:
+            for owner, overlap in tasks[task].items():
+                candidates[owner] = candidates.get(owner, 0) + overlap
+
+        culprit = culprits.setdefault(
+            max(candidates, key=candidates.__getitem__), [0, 0],
+        )
+        culprit[0] += 1
+        culprit[1] += window_end - window_start
+
+    return culprits
+
+
+def get_collections(
+    stack: Recorder,
+    functions: Optional[Dict[int, List[int]]] = None,
+) -> Dict[int, List[int]]:
+    # function -> [collections, paused nanoseconds]
+    #   Collections are charged to the innermost frame open at the time,
+    #   in the task that triggered them
+    if functions is None:
+        functions = {}
+
+    collections = stack.collections or ()
+    for index in range(0, len(collections), COLLECTION_SIZE):
+        try:
+            function = functions[collections[index + COLLECTION_FUNCTION]]
+        except KeyError:
+            function = functions[collections[index + COLLECTION_FUNCTION]] = \
+                [0, 0]
+
+        function[0] += 1
+        function[1] += collections[index + COLLECTION_DURATION]
+
+    for branch in stack.iterate_branches():
+        get_collections(branch, functions)
+
+    return functions
+
+
+def get_cpu_columns(
+    *,
+    net_cpu_seconds: Optional[float],
+    raw_cpu_seconds: Optional[float],
+    raw_time_seconds: float,
+) -> Tuple[str, ...]:
+    if net_cpu_seconds is None or raw_cpu_seconds is None:
+        return ()
+
+    # Close to 100% burns CPU, close to 0% waits for something else
+    cpu_ratio: float = 100.0 * divide(
+        numerator=raw_cpu_seconds,
+        denominator=raw_time_seconds,
+        on_zero_denominator=1.0,
+    )
+
+    return (
+        f'{net_cpu_seconds:>8.2f}s',
+        f'{raw_cpu_seconds:>8.2f}s',
+        f'[{cpu_ratio:>5.1f}%]',
+    )
+
+
+def get_fan_outs(stack: Recorder) -> List[Tuple[int, int, int, int]]:
+    # (function, tasks, wall nanoseconds, busy nanoseconds) of every frame
+    #   that spawned tasks. A task is busy while its outermost frames are
+    #   open, so busy over wall is how many of them ran at once on average
+    fan_outs: List[Tuple[int, int, int, int]] = []
+    frames: Dict[int, int] = get_frames(stack)
+
+    for call, branches in sorted(stack.branches.items()):
+        fan_outs.append((
+            stack.functions[call],
+            len(branches),
+            stack.timestamps[frames[call]] - stack.timestamps[call],
+            sum(map(get_busy_time, branches)),
+        ))
+        for branch in branches:
+            fan_outs.extend(get_fan_outs(branch))
+
+    return fan_outs
+
+
+def get_busy_time(stack: Recorder) -> int:
+    # Nanoseconds the outermost frames of a branch were open
+    busy: int = 0
+    level: int = stack.levels[0]
+
+    for call, returned in get_frames(stack).items():
+        if stack.levels[call] == level:
+            busy += stack.get_duration(call, returned)
+
+    return busy
+
+
+def get_frames(stack: Recorder) -> Dict[int, int]:
+    # Index of the closing event of every frame, by the index of its call
+    frames: Dict[int, int] = {}
+    open_calls: List[int] = []
+
+    for index, event in enumerate(stack.events):
+        if event == EVENT_CALL:
+            open_calls.append(index)
+        else:
+            frames[open_calls.pop()] = index
+
+    return frames
+
+
+def get_functions_times(
+    results: List[Result],
+) -> Iterator[Tuple[
+    str, float, float, float, float, float, float, int, int, int, int,
+]]:
+    # (function, net time, raw time, net CPU, raw CPU, net suspended,
+    #   raw suspended, net memory, raw memory, times called, peak memory)
+    #   of every result, summarized fast calls are attributed to their own
+    #   functions
+    for result in results:
+        if result.bucket:
+            for function_id, aggregate in result.bucket.items():
+                yield (
+                    get_function_name(function_id),
+                    to_seconds(aggregate[AGGREGATE_SUM]),
+                    to_seconds(aggregate[AGGREGATE_SUM]),
+                    to_seconds(aggregate[BUCKET_CPU]),
+                    to_seconds(aggregate[BUCKET_CPU]),
+                    to_seconds(aggregate[BUCKET_SUSPENDED]),
+                    to_seconds(aggregate[BUCKET_SUSPENDED]),
+                    aggregate[BUCKET_MEMORY],
+                    aggregate[BUCKET_MEMORY],
+                    aggregate[AGGREGATE_COUNT],
+                    0,
+                )
+        else:
+            yield (
+                result.function,
+                result.net_time_seconds,
+                result.raw_time_seconds,
+                result.net_cpu_seconds or 0.0,
+                result.raw_cpu_seconds or 0.0,
+                result.net_suspended_seconds or 0.0,
+                result.raw_suspended_seconds or 0.0,
+                result.net_memory or 0,
+                result.raw_memory or 0,
+                result.count,
+                result.peak_memory or 0,
+            )
+
+
+def get_generator_details(generator: Optional[List[int]]) -> str:
+    # Items that a generator yielded, and for how long it lived
+    if generator is None:
+        return ''
+
+    items: str = f'{generator[GENERATOR_ITEMS]} item' + \
+        's' * (generator[GENERATOR_ITEMS] != 1)
+    if generator[GENERATOR_LIFETIME]:
+        lifetime: float = to_seconds(generator[GENERATOR_LIFETIME])
+        return f' ({items} over {lifetime:.2f}s)'
+
+    return f' ({items}, not finished)'
+
+
+def get_intervals(branches: List[Recorder]) -> List[List[int]]:
+    # [start, end] of the time some of the branches ran, sorted and merged
+    intervals: List[List[int]] = []
+
+    for branch in sorted(
+        filter(len, branches),
+        key=lambda branch: branch.timestamps[0],
+    ):
+        branch_start, branch_end = branch.timestamps[0], branch.timestamps[-1]
+        if intervals and branch_start <= intervals[-1][1]:
+            intervals[-1][1] = max(intervals[-1][1], branch_end)
+        else:
+            intervals.append([branch_start, branch_end])
+
+    return intervals
+
+
+def get_loop_columns(
+    *,
+    net_suspended_seconds: Optional[float],
+    net_time_seconds: float,
+    raw_suspended_seconds: Optional[float],
+    raw_time_seconds: float,
+) -> Tuple[str, ...]:
+    if net_suspended_seconds is None or raw_suspended_seconds is None:
+        return ()
 
-    counter: int = 0
-    results: Tuple[Result, ...] = ()
-    accumulator: Tuple[Result, ...] = ()
-    for index, frame in enumerate(stack):
-        if frame.event == 'call':
-            counter += 1
+    # Time on the loop is time that nothing else in the loop could run
+    return (
+        f'{net_time_seconds - net_suspended_seconds:>8.2f}s',
+        f'{raw_time_seconds - raw_suspended_seconds:>8.2f}s',
+        f'{raw_suspended_seconds:>8.2f}s',
+    )
 
-            frame_childs: Tuple[Frame, ...] = \
-                stack[index:stack_levels.index(frame.level, index + 1) + 1]
 
-            raw_time_seconds: float = \
-                delta(frame_childs[0].timestamp, frame_childs[-1].timestamp)
+def get_memory_columns(
+    *,
+    net_memory: Optional[int],
+    peak_memory: Optional[int],
+    raw_memory: Optional[int],
+) -> Tuple[str, ...]:
+    if net_memory is None or raw_memory is None:
+        return ()
 
-            net_time_seconds: float = \
-                raw_time_seconds - sum([
-                    +x.timestamp if x.event == 'return' else -x.timestamp
-                    for x in frame_childs
-                    if x.level == frame.level + 1
-                ])
+    # Bytes that were allocated and not released, and the most that the
+    #   traced memory grew over its size at the call
+    return (
+        get_size_column(net_memory),
+        get_size_column(raw_memory),
+        f'{"-":>9}' if peak_memory is None else get_size_column(peak_memory),
+    )
 
-            results += (Result(
+
+def get_outcome(stack: Recorder, index: int) -> str:
+    # How a frame ended, given its closing event, if it did not return
+    #   Failed frames are rendered and summarized apart from the others
+    event: int = stack.events[index]
+
+    if event == EVENT_CANCEL:
+        return ' (cancelled)'
+    if event == EVENT_EXCEPTION:
+        return f' (raised {get_function_name(stack.exceptions[index])})'
+
+    return ''
+
+
+def get_result(  # pylint: disable=too-many-arguments
+    *,
+    bucket: Optional[Dict[int, List[int]]] = None,
+    count: int,
+    counter: int,
+    details: str = '',
+    function: str,
+    level: int,
+    net_cpu: Optional[int],
+    net_memory: Optional[int],
+    net_suspended: Optional[int],
+    net_time: int,
+    peak_memory: Optional[int],
+    raw_cpu: Optional[int],
+    raw_memory: Optional[int],
+    raw_suspended: Optional[int],
+    raw_time: int,
+    relative_timestamp: int,
+    total_time: int,
+) -> Result:
+    # Times are given in nanoseconds and rendered in seconds
+    net_time_seconds: float = to_seconds(net_time)
+    raw_time_seconds: float = to_seconds(raw_time)
+    total_time_seconds: float = to_seconds(total_time)
+
+    return Result(
+        bucket=bucket,
+        count=count,
+        counter=counter,
+        details=details,
+        function=function,
+        indentation=(
+            (3 * CHAR_SPACE + CHAR_BROKEN_BAR) * (level - 1) +
+            (3 * CHAR_SPACE + CHAR_CHECK_MARK)
+        ),
+        level=level,
+        net_cpu_seconds=None if net_cpu is None else to_seconds(net_cpu),
+        net_memory=net_memory,
+        net_suspended_seconds=(
+            None if net_suspended is None else to_seconds(net_suspended)
+        ),
+        net_time_ratio=100.0 * divide(
+            numerator=net_time_seconds,
+            denominator=total_time_seconds,
+            on_zero_denominator=1.0,
+        ),
+        net_time_seconds=net_time_seconds,
+        peak_memory=peak_memory,
+        relative_timestamp=to_seconds(relative_timestamp),
+        raw_cpu_seconds=None if raw_cpu is None else to_seconds(raw_cpu),
+        raw_memory=raw_memory,
+        raw_suspended_seconds=(
+            None if raw_suspended is None else to_seconds(raw_suspended)
+        ),
+        raw_time_ratio=100.0 * divide(
+            numerator=raw_time_seconds,
+            denominator=total_time_seconds,
+            on_zero_denominator=1.0,
+        ),
+        raw_time_seconds=raw_time_seconds,
+    )
+
+
+def get_segments(
+    stack: Recorder,
+) -> Iterator[Tuple[int, int, int, int]]:
+    # (start, end, function, task) of the time every frame was the innermost
+    #   open one of its task, the segments between consecutive events, in
+    #   the stack and its branches, that share its epoch. A frame is not on
+    #   top while the tasks it spawned run, they are. Collapsed calls span
+    #   from the first call to the last return, what their parent did in
+    #   between included, so their segments are their parent's
+    stack_aggregates = stack.aggregates
+    stack_functions = stack.functions
+    stack_timestamps = stack.timestamps
+
+    # Time the tasks spawned in every frame ran, as sorted disjoint
+    #   intervals, and the first one that did not end before the segments
+    #   of the frame seen so far. Segments of a frame only move forward
+    spawned: Dict[int, List[List[int]]] = {
+        call: get_intervals(branches)
+        for call, branches in stack.branches.items()
+    }
+    cursors: Dict[int, int] = {}
+
+    open_calls: List[int] = []
+    for index, event in enumerate(stack.events):
+        if event == EVENT_CALL:
+            open_calls.append(index)
+        else:
+            open_calls.pop()
+
+        if not open_calls or index + 1 == len(stack_timestamps):
+            continue
+
+        call: int = open_calls[-1]
+        if call in stack_aggregates:
+            if len(open_calls) == 1:
+                continue
+            call = open_calls[-2]
+        start: int = stack_timestamps[index]
+        end: int = stack_timestamps[index + 1]
+
+        intervals: List[List[int]] = spawned.get(call, [])
+        position: int = cursors.get(call, 0)
+        while position < len(intervals) and intervals[position][1] <= start:
+            position += 1
+        cursors[call] = position
+
+        while start < end \
+                and position < len(intervals) \
+                and intervals[position][0] < end:
+            branch_start, branch_end = intervals[position]
+            if branch_start > start:
+                yield start, branch_start, stack_functions[call], stack.task
+            start = branch_end
+            position += 1
+
+        if start < end:
+            yield start, end, stack_functions[call], stack.task
+
+    for branch in stack.iterate_branches():
+        yield from get_segments(branch)
+
+
+def get_stacks(stack: Recorder) -> Iterator[Recorder]:
+    # The stack and its branches, at any depth
+    yield stack
+    for branch in stack.iterate_branches():
+        yield from get_stacks(branch)
+
+
+def get_size_column(size: int) -> str:
+    # Bytes, in the largest unit that leaves a few digits before the point
+    value: float = size
+    for unit in ('B', 'K', 'M'):
+        if abs(value) < 1024.0:
+            return f'{value:>8.1f}{unit}'
+        value /= 1024.0
+
+    return f'{value:>8.1f}G'
+
+
+def get_results(
+    stack: Recorder,
+    *,
+    calls: int = 0,
+    initial_timestamp: Optional[int] = None,
+    total_time: Optional[int] = None,
+) -> List[Result]:
+    # Match every call with its return in a single pass over the stack
+    #   Branches are rendered after the childs of the frame they were
+    #   spawned in, with the times of the transaction, and their
+    #   outermost frames are marked with the task they ran in
+    stack_branches = stack.branches
+    stack_buckets = stack.buckets
+    stack_cpu_times = stack.cpu_times
+    stack_functions = stack.functions
+    stack_generators = stack.generators
+    stack_memory_peaks = stack.memory_peaks
+    stack_memory_sizes = stack.memory_sizes
+    stack_resumes = stack.resumes
+    stack_suspended_times = stack.suspended_times
+    stack_timestamps = stack.timestamps
+
+    if initial_timestamp is None:
+        initial_timestamp = stack_timestamps[0]
+    if total_time is None:
+        total_time = stack_timestamps[-1] - initial_timestamp
+
+    # Pending results are placeholders until their return event is seen
+    #   Every generator renders its frames in a list of its own, nested in
+    #   the results where it was first resumed, so the frames of its later
+    #   resumes are appended to it. Lists are flattened at the end
+    results: List[Any] = []
+    # One entry per open call: (result index, counter, calls collapsed,
+    #   call timestamp, childs time, bucket of fast calls, call CPU time,
+    #   childs CPU time, call suspended time, childs suspended time,
+    #   call memory, childs memory, highest memory peak so far,
+    #   call event index, results it's in)
+    open_calls: List[List[Any]] = []
+    # Results of the generators whose parent is still open, by the index
+    #   of the call event of their first frame
+    generators: Dict[int, List[Any]] = {}
+    # Generators by the index of the call event of their parent
+    generators_by_parent: Dict[int, List[int]] = {}
+    # Calls seen so far, collapsed ones included, are given as calls
+
+    for index, (event, level) in enumerate(zip(stack.events, stack.levels)):
+        timestamp: int = stack_timestamps[index]
+        cpu_time: int = \
+            0 if stack_cpu_times is None else stack_cpu_times[index]
+        suspended_time: int = \
+            0 if stack_suspended_times is None \
+            else stack_suspended_times[index]
+        memory_size: int = \
+            0 if stack_memory_sizes is None else stack_memory_sizes[index]
+        memory_peak: int = \
+            0 if stack_memory_peaks is None else stack_memory_peaks[index]
+
+        if event == EVENT_CALL:
+            # The peak before a call happened in its parent
+            if open_calls:
+                open_calls[-1][12] = max(open_calls[-1][12], memory_peak)
+
+            # Results the call and its childs go to
+            output: List[Any] = \
+                results if not open_calls else open_calls[-1][14]
+            frame: Optional[int] = stack_resumes.get(index)
+            if frame is not None and frame in generators:
+                output = generators[frame]
+            elif index in stack_generators:
+                output.append([])
+                output = output[-1]
+
+            count: int = stack.get_count(index)
+            open_calls.append([
+                len(output),
+                calls + 1,
+                count,
+                timestamp,
+                0,
+                stack_buckets.get(index),
+                cpu_time,
+                0,
+                suspended_time,
+                0,
+                memory_size,
+                0,
+                memory_size,
+                index,
+                output,
+            ])
+            output.append(None)
+            calls += count
+        else:
+            (
+                result_index,
+                counter,
+                count,
+                call_timestamp,
+                childs_time,
+                bucket,
+                call_cpu_time,
+                childs_cpu_time,
+                call_suspended_time,
+                childs_suspended_time,
+                call_memory,
+                childs_memory,
+                highest_memory,
+                call_index,
+                output,
+            ) = open_calls.pop()
+
+            raw_time: int = stack.get_duration(call_index, index)
+            raw_cpu_time: int = cpu_time - call_cpu_time
+            raw_suspended_time: int = suspended_time - call_suspended_time
+            raw_memory: int = memory_size - call_memory
+            highest_memory = max(highest_memory, memory_peak)
+
+            if bucket:
+                # Fast calls are rendered as a single child after the others
+                bucket_time: int = sum(
+                    aggregate[AGGREGATE_SUM] for aggregate in bucket.values()
+                )
+                bucket_count: int = sum(
+                    aggregate[AGGREGATE_COUNT] for aggregate in bucket.values()
+                )
+                bucket_cpu_time: int = sum(
+                    aggregate[BUCKET_CPU] for aggregate in bucket.values()
+                )
+                bucket_suspended_time: int = sum(
+                    aggregate[BUCKET_SUSPENDED]
+                    for aggregate in bucket.values()
+                )
+                bucket_memory: int = sum(
+                    aggregate[BUCKET_MEMORY] for aggregate in bucket.values()
+                )
+                childs_time += bucket_time
+                childs_cpu_time += bucket_cpu_time
+                childs_suspended_time += bucket_suspended_time
+                childs_memory += bucket_memory
+
+                output.append(get_result(
+                    bucket=bucket,
+                    count=bucket_count,
+                    counter=calls + 1,
+                    function='fast calls to ' + ', '.join(sorted(
+                        map(get_function_name, bucket),
+                    )),
+                    level=level + 1,
+                    net_cpu=(
+                        None if stack_cpu_times is None else bucket_cpu_time
+                    ),
+                    net_memory=(
+                        None if stack_memory_sizes is None else bucket_memory
+                    ),
+                    net_suspended=(
+                        None if stack_suspended_times is None
+                        else bucket_suspended_time
+                    ),
+                    net_time=bucket_time,
+                    peak_memory=None,
+                    raw_cpu=(
+                        None if stack_cpu_times is None else bucket_cpu_time
+                    ),
+                    raw_memory=(
+                        None if stack_memory_sizes is None else bucket_memory
+                    ),
+                    raw_suspended=(
+                        None if stack_suspended_times is None
+                        else bucket_suspended_time
+                    ),
+                    raw_time=bucket_time,
+                    relative_timestamp=call_timestamp - initial_timestamp,
+                    total_time=total_time,
+                ))
+                calls += bucket_count
+
+            for branch in stack_branches.get(call_index, ()):
+                branch_results: List[Result] = get_results(
+                    branch,
+                    calls=calls,
+                    initial_timestamp=initial_timestamp,
+                    total_time=total_time,
+                )
+                output.extend(branch_results)
+                calls = max(
+                    [calls] + [
+                        branch_result.counter + branch_result.count - 1
+                        for branch_result in branch_results
+                    ],
+                )
+
+            if open_calls:
+                open_calls[-1][4] += raw_time
+                open_calls[-1][7] += raw_cpu_time
+                open_calls[-1][9] += raw_suspended_time
+                open_calls[-1][11] += raw_memory
+                open_calls[-1][12] = max(open_calls[-1][12], highest_memory)
+
+            result: Result = get_result(
+                count=count,
                 counter=counter,
-                function=frame.function,
-                indentation=(
-                    (3 * CHAR_SPACE + CHAR_BROKEN_BAR) * (frame.level - 1) +
-                    (3 * CHAR_SPACE + CHAR_CHECK_MARK)
+                details=get_generator_details(
+                    stack_generators.get(call_index),
+                ) + (f' [task {stack.task}]' * (
+                    stack.task > 0 and not open_calls
+                )),
+                function=(
+                    get_function_name(stack_functions[index])
+                    + get_outcome(stack, index)
                 ),
-                level=frame.level,
-                net_time_ratio=100.0 * divide(
-                    numerator=net_time_seconds,
-                    denominator=total_time_seconds,
-                    on_zero_denominator=1.0,
+                level=level,
+                net_cpu=(
+                    None if stack_cpu_times is None
+                    else raw_cpu_time - childs_cpu_time
                 ),
-                net_time_seconds=net_time_seconds,
-                relative_timestamp=delta(stack[0].timestamp, frame.timestamp),
-                raw_time_ratio=100.0 * divide(
-                    numerator=raw_time_seconds,
-                    denominator=total_time_seconds,
-                    on_zero_denominator=1.0,
+                net_memory=(
+                    None if stack_memory_sizes is None
+                    else raw_memory - childs_memory
                 ),
-                raw_time_seconds=raw_time_seconds,
-            ),)
+                net_suspended=(
+                    None if stack_suspended_times is None
+                    else raw_suspended_time - childs_suspended_time
+                ),
+                net_time=raw_time - childs_time,
+                peak_memory=(
+                    None if stack_memory_sizes is None
+                    else max(0, highest_memory - call_memory)
+                ),
+                raw_cpu=None if stack_cpu_times is None else raw_cpu_time,
+                raw_memory=None if stack_memory_sizes is None else raw_memory,
+                raw_suspended=(
+                    None if stack_suspended_times is None
+                    else raw_suspended_time
+                ),
+                raw_time=raw_time,
+                relative_timestamp=call_timestamp - initial_timestamp,
+                total_time=total_time,
+            )
+
+            frame = stack_resumes.get(call_index)
+            if frame is not None and frame in generators:
+                # Later resumes are added to the first frame, their own
+                #   frames are already in the results of the generator
+                output[result_index] = None
+                output[0] = merge_results(output[0], result)
+            else:
+                output[result_index] = result
+                if call_index in stack_generators:
+                    generators[call_index] = output
+                    parent: int = \
+                        stack_generators[call_index][GENERATOR_PARENT]
+                    try:
+                        generators_by_parent[parent].append(call_index)
+                    except KeyError:
+                        generators_by_parent[parent] = [call_index]
+                elif frame is None:
+                    # Generators can not be resumed once their parent closed
+                    drop_generators(
+                        generators, generators_by_parent, call_index,
+                    )
+
+    return list(flatten_results(results))
+
+
+def drop_generators(
+    generators: Dict[int, List[Any]],
+    generators_by_parent: Dict[int, List[int]],
+    parent: int,
+) -> None:
+    # The generators of a parent, and the ones they resumed in turn
+    for frame in generators_by_parent.pop(parent, ()):
+        del generators[frame]
+        drop_generators(generators, generators_by_parent, frame)
+
+
+def flatten_results(results: List[Any]) -> Iterator[Result]:
+    # Results of generators are nested lists, resumes merged into the
+    #   first frame of their generator left a None behind
+    for result in results:
+        if isinstance(result, list):
+            yield from flatten_results(result)
+        elif result is not None:
+            yield result
+
 
-    if results:
-        accumulator += (results[0],)
-        accumulator = flush_accumulator(accumulator)
+def merge_results(result: Result, other: Result) -> Result:
+    # Times and memory are added up, the peak is the highest of both
+    sums: Dict[str, Any] = {
+        field: None if value is None else value + getattr(other, field)
+        for field, value in zip(result._fields, result)
+        if field.startswith(('net_', 'raw_'))
+    }
 
-    for index, result in enumerate(results[1:-1], start=1):
-        accumulator += (result,)
+    return result._replace(
+        peak_memory=(
+            None if result.peak_memory is None
+            else max(result.peak_memory, other.peak_memory or 0)
+        ),
+        **sums,
+    )
+
+
+@on_error(of_type=Exception, return_value=None)
+def analyze_stack(
+    stack: Recorder,
+) -> None:
+    total_time_seconds: float = \
+        to_seconds(stack.timestamps[-1] - stack.timestamps[0])
+    headers: str = ''.join((
+        '' if stack.cpu_times is None else CPU_HEADER,
+        '' if stack.suspended_times is None else LOOP_HEADER,
+        '' if stack.memory_sizes is None else MEMORY_HEADER,
+    ))
+
+    log()
+    log(f'{CHAR_INFO} Finished transaction: {total_time_seconds:.2f} seconds'
+        f'{get_outcome(stack, len(stack) - 1)}')
+    log()
+    log('     # Timestamp                Net              Total'
+        f'{headers}    Call Chain')
+    log()
 
-        if ((result.level != results[index - 1].level or
-                result.function != results[index - 1].function) and
-            (result.level != results[index + 1].level or
-                result.function != results[index + 1].function)):
-            accumulator = flush_accumulator(accumulator)
+    results: List[Result] = get_results(stack)
 
-    if len(results) > 1:
-        accumulator += (results[-1],)
-        accumulator = flush_accumulator(accumulator)
+    # Consecutive calls to the same function are siblings, render them once
+    siblings = groupby(
+        results,
+        key=attrgetter('level', 'function', 'details'),
+    )
+    for _, accumulator in siblings:
+        flush_accumulator(tuple(accumulator))
 
     log()
-    log('           Count                Net              Total    Function')
+    log('           Count                Net              Total'
+        f'{headers}    Function')
     log()
 
-    key = attrgetter('function')
+    # function -> [net time, raw time, net CPU, raw CPU, net suspended,
+    #   raw suspended, net memory, raw memory, times called, peak memory]
+    functions: Dict[str, List[Any]] = {}
+    for name, *times, peak_memory in get_functions_times(results):
+        try:
+            function = functions[name]
+        except KeyError:
+            function = functions[name] = [0.0] * 6 + [0] * 4
 
-    for (
-        function,
-        net_time_ratio,
+        for position, value in enumerate(times):
+            function[position] += value
+        function[-1] = max(function[-1], peak_memory)
+
+    for function_name, (
         net_time_seconds,
-        raw_time_ratio,
         raw_time_seconds,
-        times_called
+        net_cpu_seconds,
+        raw_cpu_seconds,
+        net_suspended_seconds,
+        raw_suspended_seconds,
+        net_memory,
+        raw_memory,
+        times_called,
+        peak_memory,
     ) in sorted(
-        (
-            (
-                function,
-                sum(map(attrgetter('net_time_ratio'), group)),
-                sum(map(attrgetter('net_time_seconds'), group)),
-                sum(map(attrgetter('raw_time_ratio'), group)),
-                sum(map(attrgetter('raw_time_seconds'), group)),
-                len(group),
-            )
-            for function, group_iter in groupby(
-                sorted(
-                    results,
-                    key=key,
-                ),
-                key=key,
-            )
-            for group in [tuple(group_iter)]
-        ),
-        key=itemgetter(2),
-        reverse=True,
+        functions.items(),
+        key=lambda item: (-item[1][0], item[0]),
     ):
+        net_time_ratio: float = 100.0 * divide(
+            numerator=net_time_seconds,
+            denominator=total_time_seconds,
+            on_zero_denominator=1.0,
+        )
+        raw_time_ratio: float = 100.0 * divide(
+            numerator=raw_time_seconds,
+            denominator=total_time_seconds,
+            on_zero_denominator=1.0,
+        )
+
         log(
             f'{times_called:>16}',
             f'{net_time_seconds:>8.2f}s',
             f'[{net_time_ratio:>5.1f}%]',
             f'{raw_time_seconds:>8.2f}s',
             f'[{raw_time_ratio:>5.1f}%]',
+            *get_cpu_columns(
+                net_cpu_seconds=(
+                    None if stack.cpu_times is None else net_cpu_seconds
+                ),
+                raw_cpu_seconds=raw_cpu_seconds,
+                raw_time_seconds=raw_time_seconds,
+            ),
+            *get_loop_columns(
+                net_suspended_seconds=(
+                    None if stack.suspended_times is None
+                    else net_suspended_seconds
+                ),
+                net_time_seconds=net_time_seconds,
+                raw_suspended_seconds=raw_suspended_seconds,
+                raw_time_seconds=raw_time_seconds,
+            ),
+            *get_memory_columns(
+                net_memory=None if stack.memory_sizes is None else net_memory,
+                peak_memory=peak_memory,
+                raw_memory=raw_memory,
+            ),
             f'{3 * CHAR_SPACE + CHAR_CHECK_MARK}',
-            f'{function}',
+            f'{function_name}',
         )
 
 
 def flush_accumulator(accumulator: Tuple[Result, ...]) -> Tuple[Result, ...]:
     if accumulator:
-        times: str = f'{len(accumulator)} times: ' * (len(accumulator) > 1)
+        count: int = sum(map(attrgetter('count'), accumulator))
+        times: str = f'{count} times: ' * (count > 1)
+        net_time_seconds: float = \
+            sum(map(attrgetter('net_time_seconds'), accumulator))
+        raw_time_seconds: float = \
+            sum(map(attrgetter('raw_time_seconds'), accumulator))
 
         log(
             f'{accumulator[0].counter:>6}',
             f'{accumulator[0].relative_timestamp:>8.2f}s',
-            f'{sum(map(attrgetter("net_time_seconds"), accumulator)):>8.2f}s',
+            f'{net_time_seconds:>8.2f}s',
             f'[{sum(map(attrgetter("net_time_ratio"), accumulator)):>5.1f}%]',
-            f'{sum(map(attrgetter("raw_time_seconds"), accumulator)):>8.2f}s',
+            f'{raw_time_seconds:>8.2f}s',
             f'[{sum(map(attrgetter("raw_time_ratio"), accumulator)):>5.1f}%]',
+            *get_cpu_columns(
+                net_cpu_seconds=None
+                if accumulator[0].net_cpu_seconds is None
+                else sum(map(attrgetter('net_cpu_seconds'), accumulator)),
+                raw_cpu_seconds=None
+                if accumulator[0].raw_cpu_seconds is None
+                else sum(map(attrgetter('raw_cpu_seconds'), accumulator)),
+                raw_time_seconds=raw_time_seconds,
+            ),
+            *get_loop_columns(
+                net_suspended_seconds=None
+                if accumulator[0].net_suspended_seconds is None
+                else sum(map(
+                    attrgetter('net_suspended_seconds'), accumulator,
+                )),
+                net_time_seconds=net_time_seconds,
+                raw_suspended_seconds=None
+                if accumulator[0].raw_suspended_seconds is None
+                else sum(map(
+                    attrgetter('raw_suspended_seconds'), accumulator,
+                )),
+                raw_time_seconds=raw_time_seconds,
+            ),
+            *get_memory_columns(
+                net_memory=None
+                if accumulator[0].net_memory is None
+                else sum(map(attrgetter('net_memory'), accumulator)),
+                peak_memory=None
+                if accumulator[0].peak_memory is None
+                else max(map(attrgetter('peak_memory'), accumulator)),
+                raw_memory=None
+                if accumulator[0].raw_memory is None
+                else sum(map(attrgetter('raw_memory'), accumulator)),
+            ),
             f'{accumulator[0].indentation}',
-            f'{times}{accumulator[0].function}',
+            f'{times}{accumulator[0].function}{accumulator[0].details}',
         )
 
     return ()
@@ -11,19 +11,99 @@ def _get(var_name: str, var_default: Optional[str] = None) -> Optional[str]:
     return var_value
 
 
+def _get_bool(var_name: str, var_default: bool) -> bool:
+    var_value: Optional[str] = _get(var_name)
+    return var_default if var_value is None else \
+        var_value.strip().lower() in {'1', 'true', 'yes'}
+
+
+def _get_float(var_name: str, var_default: float) -> float:
+    var_value: Optional[str] = _get(var_name)
+    return var_default if var_value is None else float(var_value)
+
+
+def _get_int(var_name: str, var_default: int) -> int:
+    var_value: Optional[str] = _get(var_name)
+    return var_default if var_value is None else int(var_value)
+
+
 # Runtime constants
 class Config(NamedTuple):
     api_token: Optional[str]
+    cpu_time: bool
+    daemon_compression: str
+    daemon_concurrent_uploads: int
+    daemon_max_seconds_between_uploads: float
+    daemon_seconds_between_uploads: float
+    daemon_upload_max_bytes: int
+    daemon_upload_max_items: int
     endpoint_url: Optional[str]
+    gc_time: bool
+    memory: bool
+    min_duration: float
+    queue_max_bytes: int
+    queue_max_items: int
+    queue_policy: str
+    retention_quantile: float
+    sampling_policy: str
+    sampling_value: float
+    stall_threshold: float
+    suspended_time: bool
     system_id: Optional[str]
 
     api_token_source: str = 'TRACERS_API_TOKEN'
+    cpu_time_source: str = 'TRACERS_CPU_TIME'
+    daemon_compression_source: str = 'TRACERS_DAEMON_COMPRESSION'
+    daemon_concurrent_uploads_source: str = \
+        'TRACERS_DAEMON_CONCURRENT_UPLOADS'
+    daemon_max_seconds_between_uploads_source: str = \
+        'TRACERS_DAEMON_MAX_SECONDS_BETWEEN_UPLOADS'
+    daemon_seconds_between_uploads_source: str = \
+        'TRACERS_DAEMON_SECONDS_BETWEEN_UPLOADS'
+    daemon_upload_max_bytes_source: str = \
+        'TRACERS_DAEMON_UPLOAD_MAX_BYTES'
+    daemon_upload_max_items_source: str = \
+        'TRACERS_DAEMON_UPLOAD_MAX_ITEMS'
     endpoint_url_source: str = 'TRACERS_ENDPOINT_URL'
+    gc_time_source: str = 'TRACERS_GC_TIME'
+    memory_source: str = 'TRACERS_MEMORY'
+    min_duration_source: str = 'TRACERS_MIN_DURATION'
+    queue_max_bytes_source: str = 'TRACERS_QUEUE_MAX_BYTES'
+    queue_max_items_source: str = 'TRACERS_QUEUE_MAX_ITEMS'
+    queue_policy_source: str = 'TRACERS_QUEUE_POLICY'
+    retention_quantile_source: str = 'TRACERS_RETENTION_QUANTILE'
+    sampling_policy_source: str = 'TRACERS_SAMPLING_POLICY'
+    sampling_value_source: str = 'TRACERS_SAMPLING_VALUE'
+    stall_threshold_source: str = 'TRACERS_STALL_THRESHOLD'
+    suspended_time_source: str = 'TRACERS_SUSPENDED_TIME'
     system_id_source: str = 'TRACERS_SYSTEM_ID'
 
 
 CONFIG = Config(
     api_token=_get('TRACERS_API_TOKEN'),
+    cpu_time=_get_bool('TRACERS_CPU_TIME', False),
+    daemon_compression=_get('TRACERS_DAEMON_COMPRESSION') or 'gzip',
+    daemon_concurrent_uploads=_get_int(
+        'TRACERS_DAEMON_CONCURRENT_UPLOADS', 4),
+    daemon_max_seconds_between_uploads=_get_float(
+        'TRACERS_DAEMON_MAX_SECONDS_BETWEEN_UPLOADS', 30.0),
+    daemon_seconds_between_uploads=_get_float(
+        'TRACERS_DAEMON_SECONDS_BETWEEN_UPLOADS', 1.0),
+    daemon_upload_max_bytes=_get_int(
+        'TRACERS_DAEMON_UPLOAD_MAX_BYTES', 1024 * 1024),
+    daemon_upload_max_items=_get_int(
+        'TRACERS_DAEMON_UPLOAD_MAX_ITEMS', 1000),
     endpoint_url=_get('TRACERS_ENDPOINT_URL'),
+    gc_time=_get_bool('TRACERS_GC_TIME', False),
+    memory=_get_bool('TRACERS_MEMORY', False),
+    min_duration=_get_float('TRACERS_MIN_DURATION', 0.0),
+    queue_max_bytes=_get_int('TRACERS_QUEUE_MAX_BYTES', 64 * 1024 * 1024),
+    queue_max_items=_get_int('TRACERS_QUEUE_MAX_ITEMS', 10000),
+    queue_policy=_get('TRACERS_QUEUE_POLICY') or 'drop-oldest',
+    retention_quantile=_get_float('TRACERS_RETENTION_QUANTILE', 0.99),
+    sampling_policy=_get('TRACERS_SAMPLING_POLICY') or 'always',
+    sampling_value=_get_float('TRACERS_SAMPLING_VALUE', 1.0),
+    stall_threshold=_get_float('TRACERS_STALL_THRESHOLD', 0.0),
+    suspended_time=_get_bool('TRACERS_SUSPENDED_TIME', False),
     system_id=_get('TRACERS_SYSTEM_ID', 'default'),
 )
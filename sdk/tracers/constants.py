@@ -4,12 +4,19 @@ from typing import (
     TypeVar,
 )
 
+AGGREGATE_SIZE: int = 5 * 8
+
 CHAR_SPACE = chr(0x20)
 CHAR_INFO = chr(0x1F6C8) + CHAR_SPACE
 CHAR_CHECK_MARK = chr(0X2713)
 CHAR_BROKEN_BAR = chr(0xA6)
 CHAR_SUPERSCRIPT_ONE = chr(0x00B9)
 
+DAEMON_COMPRESSION_LEVEL: int = 1
+DAEMON_IDLE_BACKOFF_FACTOR: float = 2.0
+DAEMON_IDLE_MIN_SECONDS: float = 0.1
+DAEMON_KEEPALIVE_SECONDS: float = 60.0
+
 LOGGER_DAEMON_HANDLER: logging.Handler = logging.StreamHandler()
 LOGGER_DAEMON_HANDLER.setLevel(logging.INFO)
 LOGGER_DAEMON_HANDLER.setFormatter(
@@ -32,6 +39,24 @@ if not LOGGER_DEFAULT.hasHandlers():
     LOGGER_DEFAULT.addHandler(LOGGER_DEFAULT_HANDLER)
 
 LOOP_CHECK_INTERVAL: float = 0.01
+LOOP_SKEW_SIZE: int = 4 * 8
 LOOP_SKEW_TOLERANCE: float = 1.0
+LOOP_SNAPSHOTS_SIZE: int = 4096
+LOOP_STALL_SIZE: int = 5 * 8
+LOOP_STALLS_SIZE: int = 1024
+
+NANOSECONDS_PER_SECOND: int = 10 ** 9
+
+REPORTS_QUEUE_SIZE: int = 1024
+REPORTS_SHUTDOWN_TIMEOUT: float = 5.0
+
+RETENTION_BUCKETS: int = 128
+RETENTION_BUCKETS_PER_OCTAVE: int = 4
+RETENTION_DECAY_EVERY: int = 1024
+RETENTION_REFRESH_EVERY: int = 16
+RETENTION_WARM_UP: int = 32
+
+SAMPLING_BURST_SECONDS: float = 1.0
+SAMPLING_CALIBRATION_CALLS: int = 1000
 
 T = TypeVar('T')  # pylint: disable=invalid-name
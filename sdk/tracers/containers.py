@@ -1,23 +1,81 @@
 # Standard library
+import logging
 from typing import (
+    Dict,
     NamedTuple,
-    Tuple,
+    Optional,
+    Sequence,
+    TYPE_CHECKING,
 )
 
+if TYPE_CHECKING:
+    # Local libraries
+    from tracers.recorder import (  # noqa: F401
+        Recorder,
+    )
+
 Frame = NamedTuple('Frame', [
+    # Nanoseconds of CPU time of the thread, if they were recorded
+    ('cpu_time', Optional[int]),
     ('event', str),
-    ('function', str),
+    ('function', int),
     ('level', int),
-    ('timestamp', float),
+    # Bytes traced by tracemalloc, and their peak since the previous event,
+    #   if they were recorded
+    ('memory_peak', Optional[int]),
+    ('memory_size', Optional[int]),
+    # Nanoseconds the transaction was suspended so far, if they were recorded
+    ('suspended_time', Optional[int]),
+    # Nanoseconds since the start of the transaction
+    ('timestamp', int),
+])
+
+LoopSnapshot = NamedTuple('LoopSnapshot', [
+    ('block_duration_ratio', float),
+    # Nanoseconds, timed with the same clock as frames
+    ('real_tick_duration', int),
+    ('timestamp', int),
+    ('wanted_tick_duration', int),
+])
+
+LoopStall = NamedTuple('LoopStall', [
+    # Qualified name of the callback, or of the coroutine of a task step
+    ('callback', str),
+    # Nanoseconds, timed with the same clock as frames
+    ('duration', int),
+    ('filename', str),
+    ('line', int),
+    ('timestamp', int),
 ])
 
 DaemonResult = NamedTuple('DaemonResult', [
-    ('stack', Tuple[Frame, ...]),
+    # Only the skews of the event loop during the transaction
+    ('skews', Sequence[LoopSnapshot]),
+    ('stack', 'Recorder'),
+    ('stalls', Sequence[LoopStall]),
 ])
 
-LoopSnapshot = NamedTuple('LoopSnapshot', [
-    ('block_duration_ratio', float),
-    ('real_tick_duration', float),
-    ('timestamp', float),
-    ('wanted_tick_duration', float),
+QueueCounters = NamedTuple('QueueCounters', [
+    ('dropped_bytes', int),
+    ('dropped_items', int),
+])
+
+Report = NamedTuple('Report', [
+    ('logger', Optional[logging.Logger]),
+    ('snapshots', Sequence[LoopSnapshot]),
+    ('stack', 'Recorder'),
+    ('stalls', Sequence[LoopStall]),
+])
+
+TransactionSummary = NamedTuple('TransactionSummary', [
+    ('count', int),
+    # Nanoseconds paused by garbage collections, if they were recorded
+    ('gc_time', int),
+    ('histogram', Dict[int, int]),
+    ('initiator', int),
+    # return, exception or cancel, transactions that failed are
+    #   summarized apart from the ones that returned
+    ('outcome', str),
+    # Nanoseconds
+    ('total_time', int),
 ])
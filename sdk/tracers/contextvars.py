@@ -7,22 +7,19 @@ from logging import (
 )
 from typing import (
     Optional,
-    Tuple,
 )
 
 # Local libraries
 from tracers.constants import (
     LOGGER_DEFAULT
 )
-from tracers.containers import (
-    Frame,
+from tracers.state import (
+    State,
 )
 
-LEVEL: ContextVar[int] = \
-    ContextVar('LEVEL', default=0)
+# Logger of the transaction being analyzed by the reporter
 LOGGER: ContextVar[Optional[Logger]] = \
     ContextVar('LOGGER', default=LOGGER_DEFAULT)
-STACK: ContextVar[Tuple[Frame, ...]] = \
-    ContextVar('STACK', default=())
-TRACING: ContextVar[bool] = \
-    ContextVar('TRACING', default=True)
+# State of the transaction in progress, if any
+STATE: ContextVar[Optional[State]] = \
+    ContextVar('STATE', default=None)
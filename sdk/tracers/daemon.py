@@ -1,42 +1,62 @@
 # Standard library
 import asyncio
-from collections import deque
-from threading import Thread
+import contextlib
+import os
+import threading
 from typing import (
-    Any,
-    Deque,
-    Dict,
+    Optional,
+    Set,
     Tuple,
 )
 
-# Third party libraries
-import aiohttp
-import aiogqlc
-from more_itertools import iter_except
-
 # Local libraries
 from tracers.config import (
     CONFIG,
 )
 from tracers.constants import (
+    DAEMON_IDLE_BACKOFF_FACTOR,
+    DAEMON_IDLE_MIN_SECONDS,
     LOGGER_DAEMON,
 )
 from tracers.containers import (
     DaemonResult,
+    QueueCounters,
+    TransactionSummary,
 )
-from tracers.graphql import (
-    CLIENT as GRAPHQL_CLIENT,
+from tracers.queues import (
+    ResultsQueue,
 )
-from tracers.utils import (
-    delta,
-    json_dumps,
+from tracers.retention import (
+    Retention,
 )
 
 # Private constants
-_RESULTS_QUEUE: Deque[DaemonResult] = deque()
+_DAEMON: Optional[threading.Thread] = None
+_DAEMON_LOCK: threading.Lock = threading.Lock()
+_DAEMON_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_DAEMON_WAKE_UP: Optional[asyncio.Event] = None
+_RESULTS_QUEUE: ResultsQueue = ResultsQueue(
+    max_bytes=CONFIG.queue_max_bytes,
+    max_items=CONFIG.queue_max_items,
+    policy=CONFIG.queue_policy,
+)
+# What was dropped up to the last upload, rolled back if it fails
+_RESULTS_REPORTED: QueueCounters = \
+    QueueCounters(dropped_bytes=0, dropped_items=0)
+_RETENTION: Retention = Retention(quantile=CONFIG.retention_quantile)
 
 
 async def daemon() -> None:
+    global _DAEMON_LOOP, _DAEMON_WAKE_UP  # pylint: disable=global-statement
+
+    # The network stack is imported by the daemon, not by the SDK users
+    # pylint: disable=import-outside-toplevel
+    from tracers.graphql import CLIENT as GRAPHQL_CLIENT
+    from tracers.uploads import send_system_to_server
+
+    _DAEMON_LOOP = asyncio.get_running_loop()
+    _DAEMON_WAKE_UP = asyncio.Event()
+
     if GRAPHQL_CLIENT:
         success, msg = await send_system_to_server(client=GRAPHQL_CLIENT)
 
@@ -45,111 +65,153 @@ async def daemon() -> None:
         else:
             LOGGER_DAEMON.error('Error creating system: %s', msg)
 
-    while await asyncio.sleep(1.0, result=True):
-        results = tuple(iter_except(_RESULTS_QUEUE.pop, IndexError))
-        results_len = len(results)
+    uploads: asyncio.Semaphore = \
+        asyncio.Semaphore(CONFIG.daemon_concurrent_uploads)
+    uploads_pending: Set['asyncio.Task[None]'] = set()
+    wait: float = CONFIG.daemon_seconds_between_uploads
 
-        if GRAPHQL_CLIENT and results:
-            success, msg = await send_transactions_to_server(
-                client=GRAPHQL_CLIENT,
-                results=results,
-            )
+    while True:
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(_DAEMON_WAKE_UP.wait(), timeout=wait)
+        _DAEMON_WAKE_UP.clear()
 
-            if success:
-                LOGGER_DAEMON.info('Uploaded transactions: %s', results_len)
-            else:
-                LOGGER_DAEMON.error('Uploading transactions: %s', msg)
+        if _RESULTS_QUEUE or _RETENTION:
+            wait = CONFIG.daemon_seconds_between_uploads
+        else:
+            # Nothing to do, wake up less and less often
+            wait = min(CONFIG.daemon_max_seconds_between_uploads, max(
+                DAEMON_IDLE_BACKOFF_FACTOR * wait,
+                CONFIG.daemon_seconds_between_uploads,
+                DAEMON_IDLE_MIN_SECONDS,
+            ))
+
+        # Held back extremes are uploaded like any other kept transaction
+        extremes, summaries = _RETENTION.flush()
+        for result in extremes:
+            _RESULTS_QUEUE.put(result)
+
+        # Split what is queued in bounded chunks and upload them
+        #   concurrently, waiting when too many uploads are in-flight
+        #   Summaries of what was not kept travel with the first one
+        while _RESULTS_QUEUE or summaries:
+            await uploads.acquire()
+
+            results: Tuple[DaemonResult, ...] = _RESULTS_QUEUE.pop(
+                max_bytes=CONFIG.daemon_upload_max_bytes,
+                max_items=CONFIG.daemon_upload_max_items,
+            ) if _RESULTS_QUEUE else ()
+
+            task = asyncio.create_task(upload(
+                results=results,
+                summaries=summaries,
+            ))
+            summaries = ()
+            task.add_done_callback(lambda _: uploads.release())
+            task.add_done_callback(uploads_pending.discard)
+            uploads_pending.add(task)
+
+
+def get_queue_counters() -> QueueCounters:
+    return _RESULTS_QUEUE.get_counters()
+
+
+def reset_after_fork() -> None:
+    # The daemon thread does not survive a fork, and the queue was copied
+    #   from the parent, start from scratch so every process uploads its own
+    # pylint: disable=global-statement
+    global _DAEMON, _DAEMON_LOCK, _DAEMON_LOOP, _DAEMON_WAKE_UP
+    global _RESULTS_QUEUE, _RESULTS_REPORTED, _RETENTION
+
+    _DAEMON = None
+    _DAEMON_LOCK = threading.Lock()
+    _DAEMON_LOOP = None
+    _DAEMON_WAKE_UP = None
+    _RESULTS_QUEUE = ResultsQueue(
+        max_bytes=CONFIG.queue_max_bytes,
+        max_items=CONFIG.queue_max_items,
+        policy=CONFIG.queue_policy,
+    )
+    _RESULTS_REPORTED = QueueCounters(dropped_bytes=0, dropped_items=0)
+    _RETENTION = Retention(quantile=CONFIG.retention_quantile)
 
 
 def send_result_to_daemon(
     *,
     result: DaemonResult,
 ) -> None:
-    _RESULTS_QUEUE.appendleft(result)
+    if _DAEMON is None:
+        start_daemon()
+
+    # Transactions that are not kept only count towards the summaries
+    if _RETENTION.keep(result) and _RESULTS_QUEUE.put(result) and (
+        len(_RESULTS_QUEUE) >= CONFIG.daemon_upload_max_items
+        or _RESULTS_QUEUE.bytes >= CONFIG.daemon_upload_max_bytes
+    ):
+        wake_up_daemon()
+
+
+def start_daemon() -> None:
+    global _DAEMON  # pylint: disable=global-statement
+
+    with _DAEMON_LOCK:
+        if _DAEMON is None:
+            _DAEMON = threading.Thread(
+                daemon=True,
+                name='Tracers Daemon',
+                target=lambda: asyncio.run(daemon()),
+            )
+            _DAEMON.start()
 
 
-async def request_server(
+async def upload(
     *,
-    client: aiogqlc.GraphQLClient,
-    query: str,
-    variables: Dict[str, Any] = {},
-) -> Tuple[bool, str]:
-    msg: str
-    success: bool
-
-    try:
-        await client.execute(query=query, variables=variables)
-    except aiohttp.ClientError as exception:
-        msg, success = str(exception), False
-    else:
-        msg, success = '', True
+    results: Tuple[DaemonResult, ...],
+    summaries: Tuple[TransactionSummary, ...],
+) -> None:
+    global _RESULTS_REPORTED  # pylint: disable=global-statement
 
-    return success, msg
+    # pylint: disable=import-outside-toplevel
+    from tracers.graphql import CLIENT as GRAPHQL_CLIENT
+    from tracers.uploads import send_transactions_to_server
 
+    if not GRAPHQL_CLIENT:
+        return
 
-async def send_system_to_server(
-    *,
-    client: aiogqlc.GraphQLClient,
-) -> Tuple[bool, str]:
-    return await request_server(
-        client=client,
-        query="""
-            mutation(
-                $systemId: String!
-            ) {
-                putSystem(
-                    systemId: $systemId
-                ) {
-                    success
-                }
-            }
-        """,
-        variables={
-            'systemId': CONFIG.system_id,
-        },
+    counters: QueueCounters = get_queue_counters()
+    dropped: QueueCounters = QueueCounters(
+        dropped_bytes=counters.dropped_bytes - _RESULTS_REPORTED.dropped_bytes,
+        dropped_items=counters.dropped_items - _RESULTS_REPORTED.dropped_items,
     )
+    _RESULTS_REPORTED = counters
 
-
-async def send_transactions_to_server(
-    *,
-    client: aiogqlc.GraphQLClient,
-    results: Tuple[DaemonResult, ...],
-) -> Tuple[bool, str]:
-    return await request_server(
-        client=client,
-        query="""
-            mutation(
-                $systemId: String!
-                $transactions: [TransactionInput!]!
-            ) {
-                putTransactions(
-                    systemId: $systemId
-                    transactions: $transactions
-                ) {
-                    success
-                }
-            }
-        """,
-        variables={
-            'systemId': CONFIG.system_id,
-            'transactions': [
-                {
-                    'initiator': result.stack[0].function,
-                    'stack': json_dumps(result.stack),
-                    'totalTime': str(delta(
-                        result.stack[0].timestamp,
-                        result.stack[-1].timestamp,
-                    )),
-                }
-                for result in results
-            ],
-        },
+    success, msg = await send_transactions_to_server(
+        client=GRAPHQL_CLIENT,
+        dropped=dropped,
+        results=results,
+        summaries=summaries,
     )
 
-
-# Side effect: Start an asynchronous daemon server
-Thread(
-    daemon=True,
-    name='Tracers Daemon',
-    target=lambda: asyncio.run(daemon()),
-).start()
+    if success:
+        LOGGER_DAEMON.info('Uploaded transactions: %s', len(results))
+    else:
+        _RESULTS_REPORTED = QueueCounters(
+            dropped_bytes=(
+                _RESULTS_REPORTED.dropped_bytes - dropped.dropped_bytes
+            ),
+            dropped_items=(
+                _RESULTS_REPORTED.dropped_items - dropped.dropped_items
+            ),
+        )
+        LOGGER_DAEMON.error('Uploading transactions: %s', msg)
+
+
+def wake_up_daemon() -> None:
+    # Called from any thread, the daemon runs in its own event loop
+    if _DAEMON_LOOP and _DAEMON_WAKE_UP and not _DAEMON_WAKE_UP.is_set():
+        # The loop is closed if the daemon is no longer running
+        with contextlib.suppress(RuntimeError):
+            _DAEMON_LOOP.call_soon_threadsafe(_DAEMON_WAKE_UP.set)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_after_fork)
@@ -1,211 +1,918 @@
 # Standard library
 import asyncio
-import contextlib
 import contextvars
 import functools
+import inspect
 import logging
 import threading
+import types
 from typing import (
     Any,
+    AsyncGenerator,
     Callable,
     cast,
+    Dict,
+    Generator,
     List,
     Optional,
+    Sequence,
+    Tuple,
+    Type,
 )
+import weakref
 
 # Local libraries
-from tracers.analyzers import (
-    analyze_loop_snapshots,
-    analyze_stack,
+from tracers.config import (
+    CONFIG,
 )
 from tracers.constants import (
     LOGGER_DEFAULT,
-    LOOP_CHECK_INTERVAL,
     T,
 )
 from tracers.containers import (
     DaemonResult,
-    Frame,
     LoopSnapshot,
+    LoopStall,
+    Report,
 )
 from tracers.contextvars import (
-    LEVEL,
-    LOGGER,
-    STACK,
-    TRACING,
+    STATE,
 )
 from tracers.daemon import (
     send_result_to_daemon,
 )
+from tracers.garbage import (
+    enable_gc_tracking,
+)
+from tracers.loop import (
+    LoopMonitor,
+    get_loop_monitor,
+    is_skew,
+)
+from tracers.memory import (
+    enable_memory_tracking,
+)
+from tracers.recorder import (
+    EVENT_CALL,
+    EVENT_CANCEL,
+    EVENT_EXCEPTION,
+    EVENT_RETURN,
+    Recorder,
+)
+from tracers.registry import (
+    register_function,
+    register_function_name,
+)
+from tracers.reporter import (
+    send_report_to_worker,
+)
+from tracers.sampling import (
+    get_default_sampler,
+    Sampler,
+)
+from tracers.state import (
+    State,
+    UNTRACED,
+)
+from tracers.suspensions import (
+    track_suspensions,
+)
 from tracers.utils import (
-    condition,
     delta,
-    divide,
-    get_function_id,
+    get_current_owner,
+    get_current_task,
     get_monotonic_time,
-    increase_counter,
+    get_monotonic_time_ns,
+    to_nanoseconds,
 )
 
 
-def measure_loop_skew(
-    should_measure: threading.Event,
-    snapshots: List[LoopSnapshot],
+def finish_transaction(
+    state: State,
+    snapshots: Sequence[LoopSnapshot],
+    stalls: Sequence[LoopStall],
+    *,
+    sampler: Sampler,
 ) -> None:
+    # Analysis and rendering happen in the reporter thread,
+    #   the caller only pays for handing the transaction over
+    stack: Recorder = cast(Recorder, state.recorder)
+
+    # Spawned tasks that are still running stop recording
+    for branch in state.branches:
+        branch.owner = None
+        branch.tracing = False
+    stack.prune()
+
+    sampler.account(stack)
+
+    if state.logger:
+        send_report_to_worker(
+            report=Report(
+                logger=state.logger,
+                snapshots=snapshots,
+                stack=stack,
+                stalls=stalls,
+            ),
+        )
 
-    def callback_handler(start_timestamp: float) -> None:
-        real_tick_duration: float = \
-            delta(start_timestamp, get_monotonic_time())
+    send_result_to_daemon(
+        result=DaemonResult(
+            skews=tuple(filter(is_skew, snapshots)),
+            stack=stack,
+            stalls=stalls,
+        ),
+    )
 
-        snapshots.append(LoopSnapshot(
-            block_duration_ratio=divide(
-                numerator=real_tick_duration,
-                denominator=LOOP_CHECK_INTERVAL,
-                on_zero_denominator=1.0,
-            ),
-            real_tick_duration=real_tick_duration,
-            timestamp=start_timestamp,
-            wanted_tick_duration=LOOP_CHECK_INTERVAL,
-        ))
 
-        schedule_callback()
+def get_async_generator_wrapper(
+    function: Callable[..., Any],
+    *,
+    function_id: int,
+) -> Callable[..., Any]:
+
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        state: Optional[State] = STATE.get()
+
+        if state is not None \
+                and state.tracing \
+                and state.owner != get_current_owner():
+            state = get_branch(state)
+
+        if state is None or not state.tracing:
+            # No overhead is introduced!
+            return function(*args, **kwargs)
+
+        return trace_async_generator(
+            function(*args, **kwargs),
+            GeneratorFrame(function_id=function_id, state=state),
+        )
+
+    return wrapper
 
-    def schedule_callback() -> None:
-        if should_measure.is_set():
-            with contextlib.suppress(RuntimeError):
-                asyncio.get_running_loop().call_later(
-                    LOOP_CHECK_INTERVAL,
-                    callback_handler,
-                    get_monotonic_time(),
+
+def get_async_wrapper(  # noqa: MC0001
+    function: Callable[..., Any],
+    *,
+    cpu_time: bool,
+    function_id: int,
+    gc_time: bool,
+    log_to: Optional[logging.Logger],
+    memory: bool,
+    min_duration: int,
+    sampler: Sampler,
+    suspended_time: bool,
+) -> Callable[..., Any]:
+
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        state: Optional[State] = STATE.get()
+        token: Optional[contextvars.Token[Optional[State]]] = None
+
+        if state is None:
+            # Root of a transaction, this is where it's sampled or not
+            if not sampler.sample(function_id):
+                token = STATE.set(UNTRACED)
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    STATE.reset(token)
+
+            state = start_transaction(
+                cpu_time=cpu_time,
+                gc_time=gc_time,
+                logger=log_to,
+                memory=memory,
+                suspended_time=suspended_time,
+            )
+            # Before the context changes, there is nothing to undo if it fails
+            monitor: Optional[LoopMonitor] = get_loop_monitor()
+            if monitor is not None:
+                position, stalls_position = monitor.start_transaction()
+            token = STATE.set(state)
+        elif not state.tracing:
+            # No overhead is introduced!
+            return await function(*args, **kwargs)
+        elif state.owner != get_current_owner():
+            branch: Optional[State] = get_branch(state)
+            if branch is None:
+                return await function(*args, **kwargs)
+            state = branch
+
+        recorder: Recorder = cast(Recorder, state.recorder)
+        state.level += 1
+        recorder.record(
+            EVENT_CALL, function_id, state.level, get_monotonic_time_ns(),
+        )
+        try:
+            # Only the outermost frames of a task need to be driven
+            if state.level != state.base + 1 \
+                    or recorder.suspended_times is None:
+                result = await function(*args, **kwargs)
+            else:
+                result = await track_suspensions(
+                    function(*args, **kwargs),
+                    recorder,
                 )
+        except BaseException as exception:
+            record_failure(recorder, function_id, state.level, exception)
+            raise
+        else:
+            recorder.record(
+                EVENT_RETURN, function_id, state.level,
+                get_monotonic_time_ns(), min_duration,
+            )
+        finally:
+            state.level -= 1
+            if token is not None:
+                # Failed transactions are finished too
+                snapshots: Sequence[LoopSnapshot] = ()
+                stalls: Sequence[LoopStall] = ()
+                if monitor is not None:
+                    snapshots = monitor.get_snapshots(position)
+                    stalls = monitor.get_stalls(stalls_position)
+                    monitor.stop_transaction()
+                STATE.reset(token)
+                finish_transaction(state, snapshots, stalls, sampler=sampler)
 
-    schedule_callback()
+        return result
 
+    return wrapper
 
-def record_event(
-    event: str,
+
+def get_disabled_async_wrapper(
     function: Callable[..., Any],
+) -> Callable[..., Any]:
+
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        state: Optional[State] = STATE.get()
+
+        if state is None:
+            token = STATE.set(UNTRACED)
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                STATE.reset(token)
+
+        if not state.tracing or state.owner != get_current_owner():
+            return await function(*args, **kwargs)
+
+        # Disable downstream tracers
+        state.tracing = False
+        try:
+            return await function(*args, **kwargs)
+        finally:
+            state.tracing = True
+
+    return wrapper
+
+
+def get_disabled_sync_wrapper(
+    function: Callable[..., Any],
+) -> Callable[..., Any]:
+
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        state: Optional[State] = STATE.get()
+
+        if state is None:
+            token = STATE.set(UNTRACED)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                STATE.reset(token)
+
+        if not state.tracing or state.owner != get_current_owner():
+            return function(*args, **kwargs)
+
+        # Disable downstream tracers
+        state.tracing = False
+        try:
+            return function(*args, **kwargs)
+        finally:
+            state.tracing = True
+
+    return wrapper
+
+
+def get_branch(state: State) -> Optional[State]:
+    # State of the current task, spawned inside the transaction of state
+    #   Its frames are nested in the frame of state that is open when it
+    #   first records, usually the one that spawned it and awaits it. The
+    #   state is kept in the context of the task for the frames to come
+    task: Optional[Any] = get_current_task()
+    root: State = state.root or state
+    recorder: Recorder = cast(Recorder, state.recorder)
+
+    # Not in other threads, nor once the frame or the transaction finished
+    if task is None \
+            or root.thread != threading.get_ident() \
+            or not recorder.open_calls \
+            or not cast(Recorder, root.recorder).open_calls:
+        return None
+
+    branch: State = State(
+        logger=None,
+        owner=task,
+        recorder=recorder.branch(len(root.branches) + 1),
+        tracing=True,
+    )
+    branch.base = branch.level = state.level
+    branch.root = root
+    root.branches.append(branch)
+    STATE.set(branch)
+
+    return branch
+
+
+def get_generator_wrapper(
+    function: Callable[..., Any],
+    *,
+    function_id: int,
+) -> Callable[..., Any]:
+
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        state: Optional[State] = STATE.get()
+
+        if state is not None \
+                and state.tracing \
+                and state.owner != get_current_owner():
+            state = get_branch(state)
+
+        if state is None or not state.tracing:
+            # No overhead is introduced!
+            return function(*args, **kwargs)
+
+        return trace_generator(
+            function(*args, **kwargs),
+            GeneratorFrame(function_id=function_id, state=state),
+        )
+
+    return wrapper
+
+
+def get_min_duration(min_duration: Optional[float]) -> int:
+    # Leaf calls faster than this are summarized in their parent,
+    #   configured in seconds and recorded in nanoseconds
+    return to_nanoseconds(
+        CONFIG.min_duration if min_duration is None else min_duration
+    )
+
+
+def get_sync_wrapper(
+    function: Callable[..., Any],
+    *,
+    cpu_time: bool,
+    function_id: int,
+    gc_time: bool,
+    log_to: Optional[logging.Logger],
+    memory: bool,
+    min_duration: int,
+    sampler: Sampler,
+) -> Callable[..., Any]:
+
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        state: Optional[State] = STATE.get()
+        token: Optional[contextvars.Token[Optional[State]]] = None
+
+        if state is None:
+            # Root of a transaction, this is where it's sampled or not
+            if not sampler.sample(function_id):
+                token = STATE.set(UNTRACED)
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    STATE.reset(token)
+
+            state = start_transaction(
+                cpu_time=cpu_time,
+                gc_time=gc_time,
+                logger=log_to,
+                memory=memory,
+                suspended_time=False,
+            )
+            token = STATE.set(state)
+        elif not state.tracing:
+            # No overhead is introduced!
+            return function(*args, **kwargs)
+        elif state.owner != get_current_owner():
+            branch: Optional[State] = get_branch(state)
+            if branch is None:
+                return function(*args, **kwargs)
+            state = branch
+
+        recorder: Recorder = cast(Recorder, state.recorder)
+        state.level += 1
+        recorder.record(
+            EVENT_CALL, function_id, state.level, get_monotonic_time_ns(),
+        )
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as exception:
+            record_failure(recorder, function_id, state.level, exception)
+            raise
+        else:
+            recorder.record(
+                EVENT_RETURN, function_id, state.level,
+                get_monotonic_time_ns(), min_duration,
+            )
+        finally:
+            state.level -= 1
+            if token is not None:
+                # Failed transactions are finished too
+                STATE.reset(token)
+                finish_transaction(state, (), (), sampler=sampler)
+
+        return result
+
+    return wrapper
+
+
+def measure_event_cost(*, calls: int) -> float:
+    # Extra seconds that recording one event adds over an unsampled call
+    #   Calls alternate between two functions, so their frames are kept
+    #   instead of collapsed, the most expensive path of the recorder
+
+    def function_a() -> None:
+        pass
+
+    def function_b() -> None:
+        pass
+
+    traced_a = trace(log_to=None, sampler=Sampler())(function_a)
+    traced_b = trace(log_to=None, sampler=Sampler())(function_b)
+
+    def measure(*, tracing: bool) -> float:
+        state: State = start_transaction(
+            cpu_time=False,
+            gc_time=False,
+            logger=None,
+            memory=False,
+            suspended_time=False,
+        )
+        state.level = 1
+        state.tracing = tracing
+        STATE.set(state)
+
+        start: float = get_monotonic_time()
+        for _ in range(calls // 2):
+            traced_a()
+            traced_b()
+        end: float = get_monotonic_time()
+
+        return delta(start, end)
+
+    # In a copy so the calibration does not leak into the caller's context
+    context: contextvars.Context = contextvars.copy_context()
+    traced_seconds: float = context.run(measure, tracing=True)
+    untraced_seconds: float = context.run(measure, tracing=False)
+
+    return max(0.0, traced_seconds - untraced_seconds) / (2 * calls)
+
+
+def record_failure(
+    recorder: Recorder,
+    function_id: int,
+    level: int,
+    exception: BaseException,
 ) -> None:
-    STACK.set(STACK.get() + (Frame(
-        event=event,
-        function=get_function_id(function),
-        level=LEVEL.get(),
-        timestamp=get_monotonic_time(),
-    ),))
+    # Frames that raise or that are cancelled are closed as well,
+    #   with the type of what they raised
+    recorder.record(
+        EVENT_CANCEL
+        if isinstance(exception, (asyncio.CancelledError, GeneratorExit))
+        else EVENT_EXCEPTION,
+        function_id, level, get_monotonic_time_ns(),
+    )
+    recorder.exceptions[len(recorder) - 1] = \
+        register_function(type(exception))
+
+
+def start_transaction(
+    *,
+    cpu_time: bool,
+    gc_time: bool,
+    logger: Optional[logging.Logger],
+    memory: bool,
+    suspended_time: bool,
+) -> State:
+    return State(
+        logger=logger,
+        owner=get_current_owner(),
+        recorder=Recorder(
+            cpu_time=cpu_time,
+            gc_time=gc_time,
+            memory=memory,
+            suspended_time=suspended_time,
+        ),
+        tracing=True,
+    )
+
+
+# Generator consumed inside a transaction, recorded as a single frame
+#   Every resume is timed as a call to the generator function, nested in
+#   the frame that resumed it, and the recorder folds them into the first
+#   one. Only the task that owns the transaction records the resumes, and
+#   like a span a generator never starts a transaction on its own
+class GeneratorFrame:
+
+    __slots__ = (
+        'created',
+        'frame',
+        'function_id',
+        'items',
+        'resumed',
+        'state',
+    )
+
+    def __init__(self, *, function_id: int, state: State) -> None:
+        self.created: int = get_monotonic_time_ns()
+        # Index of the call event of the first resume that was recorded
+        self.frame: int = -1
+        self.function_id: int = function_id
+        self.items: int = 0
+        self.resumed: bool = False
+        self.state: State = state
+
+    def fail(self, exception: BaseException) -> None:
+        state: State = self.state
+
+        if self.resumed:
+            self.resumed = False
+            record_failure(
+                cast(Recorder, state.recorder),
+                self.function_id,
+                state.level,
+                exception,
+            )
+            state.level -= 1
+
+    def finish(self) -> None:
+        # Exhausted, raised or closed, unless the transaction finished first
+        recorder: Recorder = cast(Recorder, self.state.recorder)
+
+        if self.frame >= 0 and recorder.open_calls:
+            recorder.record_generator(
+                self.frame,
+                self.items,
+                get_monotonic_time_ns() - self.created,
+            )
+
+    def resume(self) -> None:
+        state: State = self.state
+        recorder: Recorder = cast(Recorder, state.recorder)
 
+        # Not once the transaction finished, nor from other tasks
+        self.resumed = state.tracing \
+            and bool(recorder.open_calls) \
+            and state.owner == get_current_owner()
 
-def trace(  # noqa: MC0001
+        if self.resumed:
+            state.level += 1
+            recorder.record(
+                EVENT_CALL, self.function_id, state.level,
+                get_monotonic_time_ns(), 0, self.frame,
+            )
+            if self.frame < 0:
+                self.frame = len(recorder) - 1
+
+    def suspend(self, *, yielded: bool) -> None:
+        state: State = self.state
+        recorder: Recorder = cast(Recorder, state.recorder)
+
+        if yielded:
+            self.items += 1
+
+        if self.resumed:
+            self.resumed = False
+            recorder.record(
+                EVENT_RETURN, self.function_id, state.level,
+                get_monotonic_time_ns(), 0, self.frame,
+            )
+            state.level -= 1
+            if yielded:
+                recorder.record_generator(self.frame, self.items, 0)
+
+
+async def trace_async_generator(
+    generator: AsyncGenerator[Any, Any],
+    frame: GeneratorFrame,
+) -> AsyncGenerator[Any, Any]:
+    # Delegates to the generator like `async for` would, and forwards what
+    #   is sent or thrown into it, timing every resume
+    error: Optional[BaseException] = None
+    value: Any = None
+
+    try:
+        while True:
+            frame.resume()
+            try:
+                if error is None:
+                    item = await generator.asend(value)
+                else:
+                    item = await generator.athrow(error)
+            except StopAsyncIteration:
+                frame.suspend(yielded=False)
+                return
+            except BaseException as exception:
+                frame.fail(exception)
+                raise
+            frame.suspend(yielded=True)
+
+            try:
+                value, error = (yield item), None
+            except GeneratorExit:
+                # Cleaning up is timed as one more resume
+                frame.resume()
+                try:
+                    await generator.aclose()
+                except BaseException as exception:
+                    frame.fail(exception)
+                    raise
+                frame.suspend(yielded=False)
+                raise
+            except BaseException as exception:  # pylint: disable=broad-except
+                value, error = None, exception
+    finally:
+        frame.finish()
+
+
+def trace_generator(
+    generator: Generator[Any, Any, Any],
+    frame: GeneratorFrame,
+) -> Generator[Any, Any, Any]:
+    # Delegates to the generator like `yield from` would, timing every resume
+    error: Optional[BaseException] = None
+    value: Any = None
+
+    try:
+        while True:
+            frame.resume()
+            try:
+                if error is None:
+                    item = generator.send(value)
+                else:
+                    item = generator.throw(error)
+            except StopIteration as stop:
+                frame.suspend(yielded=False)
+                return stop.value
+            except BaseException as exception:
+                frame.fail(exception)
+                raise
+            frame.suspend(yielded=True)
+
+            try:
+                value, error = (yield item), None
+            except GeneratorExit:
+                # Cleaning up is timed as one more resume
+                frame.resume()
+                try:
+                    generator.close()
+                except BaseException as exception:
+                    frame.fail(exception)
+                    raise
+                frame.suspend(yielded=False)
+                raise
+            except BaseException as exception:  # pylint: disable=broad-except
+                value, error = None, exception
+    finally:
+        frame.finish()
+
+
+def get_wrapper(
+    function: Callable[..., Any],
+    *,
+    cpu_time: Optional[bool],
+    enabled: bool,
+    gc_time: Optional[bool],
+    log_to: Optional[logging.Logger],
+    memory: Optional[bool],
+    min_duration: Optional[float],
+    overridden_function: Optional[Callable[..., Any]],
+    sampler: Optional[Sampler],
+    suspended_time: Optional[bool],
+    target: Callable[..., Any],
+) -> Callable[..., Any]:
+    # Wrappers are specialized here, once,
+    #   calling them creates no closures nor copies any metadata
+    #   The function is inspected and the target is what they call
+    wrapper: Callable[..., Any]
+
+    gc_time = CONFIG.gc_time if gc_time is None else gc_time
+    if enabled and gc_time:
+        enable_gc_tracking()
+
+    memory = CONFIG.memory if memory is None else memory
+    if enabled and memory:
+        enable_memory_tracking()
+
+    if enabled and inspect.isasyncgenfunction(function):
+        wrapper = get_async_generator_wrapper(
+            target,
+            function_id=register_function(overridden_function or function),
+        )
+    elif enabled and inspect.isgeneratorfunction(function):
+        wrapper = get_generator_wrapper(
+            target,
+            function_id=register_function(overridden_function or function),
+        )
+    elif asyncio.iscoroutinefunction(function):
+        wrapper = get_async_wrapper(
+            target,
+            cpu_time=CONFIG.cpu_time if cpu_time is None else cpu_time,
+            function_id=register_function(overridden_function or function),
+            gc_time=gc_time,
+            log_to=log_to,
+            memory=memory,
+            min_duration=get_min_duration(min_duration),
+            sampler=sampler or get_default_sampler(),
+            suspended_time=(
+                CONFIG.suspended_time
+                if suspended_time is None
+                else suspended_time
+            ),
+        ) if enabled else get_disabled_async_wrapper(target)
+    else:
+        wrapper = get_sync_wrapper(
+            target,
+            cpu_time=CONFIG.cpu_time if cpu_time is None else cpu_time,
+            function_id=register_function(overridden_function or function),
+            gc_time=gc_time,
+            log_to=log_to,
+            memory=memory,
+            min_duration=get_min_duration(min_duration),
+            sampler=sampler or get_default_sampler(),
+        ) if enabled else get_disabled_sync_wrapper(target)
+
+    return wrapper
+
+
+def trace(
     *,
+    cpu_time: Optional[bool] = None,
     enabled: bool = True,
+    gc_time: Optional[bool] = None,
     log_to: Optional[logging.Logger] = LOGGER_DEFAULT,
+    memory: Optional[bool] = None,
+    min_duration: Optional[float] = None,
     overridden_function: Optional[Callable[..., Any]] = None,
+    sampler: Optional[Sampler] = None,
+    suspended_time: Optional[bool] = None,
 ) -> Callable[[T], T]:
 
     def decorator(function: Callable[..., Any]) -> Callable[..., Any]:
-
-        display_function = overridden_function or function
-
-        if asyncio.iscoroutinefunction(function):
-
-            @functools.wraps(function)
-            async def isolated_wrapper(*args: Any, **kwargs: Any) -> Any:
-
-                @functools.wraps(function)
-                async def wrapper(*args: Any, **kwargs: Any) -> Any:
-                    if LEVEL.get() == 0:
-                        LOGGER.set(log_to)
-
-                    if enabled and TRACING.get():
-                        with condition() as should_measure_loop_skew, \
-                                increase_counter(LEVEL):
-                            if LEVEL.get() == 1:
-                                should_measure_loop_skew.set()
-                                snapshots: List[LoopSnapshot] = []
-                                measure_loop_skew(
-                                    should_measure_loop_skew,
-                                    snapshots,
-                                )
-
-                            record_event('call', display_function)
-                            result = await function(*args, **kwargs)
-                            record_event('return', display_function)
-
-                            if LEVEL.get() == 1:
-                                stack = STACK.get()
-                                analyze_stack(stack)
-                                analyze_loop_snapshots(tuple(snapshots))
-                                send_result_to_daemon(
-                                    result=DaemonResult(
-                                        stack=stack,
-                                    ),
-                                )
-                    else:
-                        # Disable downstream tracers
-                        TRACING.set(False)
-
-                        # No overhead is introduced!
-                        result = await function(*args, **kwargs)
-
-                    return result
-
-                return await wrapper(*args, **kwargs)
-
-        elif callable(function):
-
-            @functools.wraps(function)
-            def isolated_wrapper(*args: Any, **kwargs: Any) -> Any:
-
-                @functools.wraps(function)
-                def wrapper(*args: Any, **kwargs: Any) -> Any:
-                    if LEVEL.get() == 0:
-                        LOGGER.set(log_to)
-
-                    if enabled and TRACING.get():
-                        with increase_counter(LEVEL):
-                            record_event('call', display_function)
-                            result = function(*args, **kwargs)
-                            record_event('return', display_function)
-
-                            if LEVEL.get() == 1:
-                                stack = STACK.get()
-                                analyze_stack(stack)
-                                send_result_to_daemon(
-                                    result=DaemonResult(
-                                        stack=stack,
-                                    ),
-                                )
-                    else:
-                        # Disable downstream tracers
-                        TRACING.set(False)
-
-                        # No overhead is introduced!
-                        result = function(*args, **kwargs)
-
-                    return result
-
-                if LEVEL.get() == 0:
-                    result = contextvars.copy_context().run(
-                        wrapper, *args, **kwargs
-                    )
-                else:
-                    result = wrapper(*args, **kwargs)
-
-                return result
-
-        else:
-
+        if not callable(function):
             # We were not able to wrap this object
             raise TypeError(
                 f'Expected callable or coroutine function, '
                 f'got: {type(function)}'
             )
 
-        return isolated_wrapper
+        return functools.wraps(function)(get_wrapper(
+            function,
+            cpu_time=cpu_time,
+            enabled=enabled,
+            gc_time=gc_time,
+            log_to=log_to,
+            memory=memory,
+            min_duration=min_duration,
+            overridden_function=overridden_function,
+            sampler=sampler,
+            suspended_time=suspended_time,
+            target=function,
+        ))
 
     return cast(Callable[[T], T], decorator)
 
 
-_DEFAULT_TRACER: Callable[[T], T] = trace()
+# Span of code inside a transaction, recorded as a call to a named function
+#   Only the task that owns the transaction records it, and like a traced
+#   function it never starts a transaction on its own
+#
+# Spans hold no state between enter and exit, so a single one can be used
+#   by nested blocks and concurrent tasks. It's closed if the innermost
+#   open frame of the transaction is its own
+class Span:
+
+    __slots__ = (
+        'function_id',
+        'min_duration',
+    )
+
+    def __init__(self, *, function_id: int, min_duration: int) -> None:
+        self.function_id: int = function_id
+        self.min_duration: int = min_duration
+
+    def __enter__(self) -> 'Span':
+        state: Optional[State] = STATE.get()
+
+        if state is not None \
+                and state.tracing \
+                and state.owner != get_current_owner():
+            state = get_branch(state)
+
+        if state is not None and state.tracing:
+            state.level += 1
+            cast(Recorder, state.recorder).record(
+                EVENT_CALL, self.function_id, state.level,
+                get_monotonic_time_ns(),
+            )
+
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[types.TracebackType],
+    ) -> None:
+        state: Optional[State] = STATE.get()
+
+        if state is None \
+                or not state.tracing \
+                or state.owner != get_current_owner():
+            return
+
+        recorder: Recorder = cast(Recorder, state.recorder)
+        open_calls: List[int] = recorder.open_calls
+        if not open_calls \
+                or recorder.functions[open_calls[-1]] != self.function_id \
+                or recorder.levels[open_calls[-1]] != state.level:
+            return
+
+        if exc_value is None:
+            recorder.record(
+                EVENT_RETURN, self.function_id, state.level,
+                get_monotonic_time_ns(), self.min_duration,
+            )
+        else:
+            record_failure(recorder, self.function_id, state.level, exc_value)
+        state.level -= 1
+
+    async def __aenter__(self) -> 'Span':
+        return self.__enter__()
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[types.TracebackType],
+    ) -> None:
+        self.__exit__(exc_type, exc_value, traceback)
+
+
+# Spans made by span(), by their name and min duration
+_SPANS: Dict[Tuple[str, Optional[float]], Span] = {}
+
+
+def span(name: str, *, min_duration: Optional[float] = None) -> Span:
+    # Usable with both `with` and `async with`
+    #   The function and the min duration are resolved on the first use
+    try:
+        return _SPANS[name, min_duration]
+    except KeyError:
+        result: Span = _SPANS.setdefault((name, min_duration), Span(
+            function_id=register_function_name(name),
+            min_duration=get_min_duration(min_duration),
+        ))
+
+    return result
+
+
+# Wrappers made by call(), by the function they wrap
+#   They reach it through a weak proxy so the entry goes away with it
+_DEFAULT_WRAPPERS: 'weakref.WeakKeyDictionary[Any, Callable[..., Any]]' = \
+    weakref.WeakKeyDictionary()
+
+
+def get_default_wrapper(function: Callable[..., Any]) -> Callable[..., Any]:
+    target: Callable[..., Any] = function
+
+    try:
+        return _DEFAULT_WRAPPERS[function]
+    except KeyError:
+        target = weakref.proxy(function)
+    except TypeError:
+        # Unhashable or not weakly referenceable, it's wrapped every time
+        pass
+
+    wrapper: Callable[..., Any] = get_wrapper(
+        function,
+        cpu_time=None,
+        enabled=True,
+        gc_time=None,
+        log_to=LOGGER_DEFAULT,
+        memory=None,
+        min_duration=None,
+        overridden_function=None,
+        sampler=None,
+        suspended_time=None,
+        target=target,
+    )
+
+    if target is not function:
+        _DEFAULT_WRAPPERS[function] = wrapper
+
+    return wrapper
 
 
 def call(function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
-    return _DEFAULT_TRACER(function)(*args, **kwargs)
+    return cast(T, get_default_wrapper(function)(*args, **kwargs))
@@ -0,0 +1,52 @@
+# Standard library
+import gc
+from typing import (
+    Any,
+    Dict,
+    Optional,
+)
+
+# Local libraries
+from tracers.contextvars import (
+    STATE,
+)
+from tracers.state import (
+    State,
+)
+from tracers.utils import (
+    get_current_owner,
+    get_monotonic_time_ns,
+)
+
+# Private constants
+_COLLECTION_START: int = 0
+
+
+def enable_gc_tracking() -> None:
+    # The callback is installed once and shared by every transaction,
+    #   it only records into the ones that asked for it
+    if on_collection not in gc.callbacks:
+        gc.callbacks.append(on_collection)
+
+
+def on_collection(phase: str, info: Dict[str, Any]) -> None:
+    # Collections run in the thread and context that triggered them,
+    #   and never two at a time
+    global _COLLECTION_START  # pylint: disable=global-statement
+
+    if phase == 'start':
+        _COLLECTION_START = get_monotonic_time_ns()
+        return
+
+    state: Optional[State] = STATE.get()
+    if state is not None \
+            and state.tracing \
+            and state.owner == get_current_owner():
+        recorder = state.recorder
+        if recorder is not None and recorder.collections is not None:
+            recorder.record_collection(
+                _COLLECTION_START,
+                info['generation'],
+                get_monotonic_time_ns() - _COLLECTION_START,
+                info['collected'],
+            )
@@ -1,15 +1,37 @@
 # Standard library
+import gzip
+import json
+import os
 from typing import (
+    Any,
+    Callable,
+    Dict,
     Optional,
 )
 
 # Third party libraries
-from aiogqlc import GraphQLClient
+import aiohttp
 
 # Local libraries
 from tracers.config import (
     CONFIG,
 )
+from tracers.constants import (
+    DAEMON_COMPRESSION_LEVEL,
+    DAEMON_KEEPALIVE_SECONDS,
+)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    'gzip': lambda data: gzip.compress(data, DAEMON_COMPRESSION_LEVEL),
+    'identity': lambda data: data,
+}
+if zstandard:
+    COMPRESSORS['zstd'] = zstandard.ZstdCompressor().compress
 
 REQUIRED_VARIABLES = [
     (CONFIG.api_token, CONFIG.api_token_source),
@@ -17,12 +39,88 @@ REQUIRED_VARIABLES = [
     (CONFIG.system_id, CONFIG.system_id_source),
 ]
 
+
+# A single long-lived, pooled HTTP session that compresses its requests
+#   The session is created lazily in the loop where it is first used
+class GraphQLClient:
+
+    def __init__(
+        self,
+        *,
+        compression: str,
+        connections: int,
+        endpoint: str,
+        headers: Dict[str, str],
+    ) -> None:
+        if compression not in COMPRESSORS:
+            raise ValueError(
+                f'Expected one of {tuple(COMPRESSORS)}, got: {compression}'
+            )
+
+        self.compression: str = compression
+        self.connections: int = connections
+        self.endpoint: str = endpoint
+        self.headers: Dict[str, str] = {
+            **headers,
+            'content-encoding': compression,
+            'content-type': 'application/json',
+        }
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def close(self) -> None:
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def execute(
+        self,
+        *,
+        query: str,
+        variables: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        data: bytes = COMPRESSORS[self.compression](json.dumps({
+            'query': query,
+            'variables': variables,
+        }).encode('utf-8'))
+
+        async with self.get_session().post(
+            self.endpoint,
+            data=data,
+            headers=self.headers,
+        ) as response:
+            response.raise_for_status()
+            result: Dict[str, Any] = await response.json()
+
+        return result
+
+    def forget_session(self) -> None:
+        # The session belongs to an event loop in another process, a forked
+        #   child must not close it nor reuse its connections
+        self.session = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    keepalive_timeout=DAEMON_KEEPALIVE_SECONDS,
+                    limit=self.connections,
+                ),
+            )
+
+        return self.session
+
+
 if all(var for var, _ in REQUIRED_VARIABLES):
     CLIENT: Optional[GraphQLClient] = GraphQLClient(
-        endpoint=CONFIG.endpoint_url,
+        compression=CONFIG.daemon_compression,
+        connections=CONFIG.daemon_concurrent_uploads,
+        endpoint=str(CONFIG.endpoint_url),
         headers={
             'authorization': f'Bearer {CONFIG.api_token}'
         },
     )
 else:
     CLIENT = None
+
+if CLIENT and hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=CLIENT.forget_session)
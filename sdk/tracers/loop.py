@@ -0,0 +1,240 @@
+# Standard library
+import asyncio
+import functools
+import os
+from typing import (
+    Any,
+    Callable,
+    List,
+    Optional,
+    Tuple,
+)
+from weakref import (
+    ref,
+    WeakKeyDictionary,
+)
+
+# Local libraries
+from tracers.config import (
+    CONFIG,
+)
+from tracers.constants import (
+    LOOP_CHECK_INTERVAL,
+    LOOP_SKEW_TOLERANCE,
+    LOOP_SNAPSHOTS_SIZE,
+    LOOP_STALLS_SIZE,
+)
+from tracers.containers import (
+    LoopSnapshot,
+    LoopStall,
+)
+from tracers.utils import (
+    divide,
+    get_monotonic_time_ns,
+    to_nanoseconds,
+)
+
+# Private constants
+_PACKAGE: str = os.path.dirname(__file__)
+_MONITORS: 'WeakKeyDictionary[asyncio.AbstractEventLoop, LoopMonitor]' = \
+    WeakKeyDictionary()
+_RUN_HANDLE: Callable[[asyncio.Handle], None] = \
+    asyncio.Handle._run  # type: ignore
+_STALL_THRESHOLD: int = 0
+_WANTED_TICK_DURATION: int = to_nanoseconds(LOOP_CHECK_INTERVAL)
+
+
+# One timer chain per event loop, shared by all of its transactions
+#   Snapshots are written into a ring buffer and every transaction
+#   only remembers the position of the ring in which it started
+#   Ticks are timed with the same clock as frames
+#   The monitor is the value of its loop in a weak dictionary, so it only
+#   holds a weak reference to it, and it does not keep its timer handle,
+#   which does hold one
+class LoopMonitor:
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop: 'ref[asyncio.AbstractEventLoop]' = ref(loop)
+        self.position: int = 0
+        self.snapshots: List[Optional[LoopSnapshot]] = \
+            [None] * LOOP_SNAPSHOTS_SIZE
+        self.stalls: List[Optional[LoopStall]] = [None] * LOOP_STALLS_SIZE
+        self.stalls_position: int = 0
+        self.scheduled: bool = False
+        self.transactions: int = 0
+
+    def callback_handler(self, start_timestamp: int) -> None:
+        real_tick_duration: int = get_monotonic_time_ns() - start_timestamp
+
+        self.scheduled = False
+        self.snapshots[self.position % LOOP_SNAPSHOTS_SIZE] = LoopSnapshot(
+            block_duration_ratio=divide(
+                numerator=real_tick_duration,
+                denominator=_WANTED_TICK_DURATION,
+                on_zero_denominator=1.0,
+            ),
+            real_tick_duration=real_tick_duration,
+            timestamp=start_timestamp,
+            wanted_tick_duration=_WANTED_TICK_DURATION,
+        )
+        self.position += 1
+
+        # Stop measuring once there is nobody interested in the results
+        if self.transactions:
+            self.schedule_callback()
+
+    def get_snapshots(self, start: int) -> Tuple[LoopSnapshot, ...]:
+        # Older snapshots may have been overwritten by now
+        start = max(start, self.position - LOOP_SNAPSHOTS_SIZE)
+
+        return tuple(
+            self.snapshots[position % LOOP_SNAPSHOTS_SIZE]  # type: ignore
+            for position in range(start, self.position)
+        )
+
+    def get_stalls(self, start: int) -> Tuple[LoopStall, ...]:
+        # Older stalls may have been overwritten by now
+        start = max(start, self.stalls_position - LOOP_STALLS_SIZE)
+
+        return tuple(
+            self.stalls[position % LOOP_STALLS_SIZE]  # type: ignore
+            for position in range(start, self.stalls_position)
+        )
+
+    def record_stall(
+        self,
+        callback: Callable[..., Any],
+        timestamp: int,
+        duration: int,
+    ) -> None:
+        name, filename, line = describe_callback(callback)
+
+        self.stalls[self.stalls_position % LOOP_STALLS_SIZE] = LoopStall(
+            callback=name,
+            duration=duration,
+            filename=filename,
+            line=line,
+            timestamp=timestamp,
+        )
+        self.stalls_position += 1
+
+    def schedule_callback(self) -> None:
+        # Stop measuring once the loop is gone or closed
+        loop: Optional[asyncio.AbstractEventLoop] = self.loop()
+        if loop is None or loop.is_closed():
+            return
+
+        loop.call_later(
+            LOOP_CHECK_INTERVAL,
+            self.callback_handler,
+            get_monotonic_time_ns(),
+        )
+        self.scheduled = True
+
+    def start_transaction(self) -> Tuple[int, int]:
+        self.transactions += 1
+
+        if not self.scheduled:
+            self.schedule_callback()
+
+        return self.position, self.stalls_position
+
+    def stop_transaction(self) -> None:
+        self.transactions -= 1
+
+
+def describe_callback(callback: Callable[..., Any]) -> Tuple[str, str, int]:
+    # (qualified name, source file, first line) of what a handle runs
+    #   Steps of a task are described by the coroutine the task drives,
+    #   or by the one it awaits if the former is a wrapper of this package
+    target: Any = callback
+    while isinstance(target, functools.partial):
+        target = target.func
+
+    owner: Any = getattr(target, '__self__', None)
+    if isinstance(owner, asyncio.Task):
+        # Task.get_coro() is not there before Python 3.8
+        target = getattr(owner, '_coro', None)
+        code: Any = _get_code(target)
+        while code is not None and code.co_filename.startswith(_PACKAGE):
+            awaited: Any = getattr(target, 'cr_await', None) \
+                or getattr(target, 'gi_yieldfrom', None)
+            if awaited is None:
+                break
+            target, code = awaited, _get_code(awaited)
+    else:
+        target = getattr(target, '__func__', target)
+        code = getattr(target, '__code__', None)
+
+    name: str = '.'.join(filter(None, (
+        getattr(target, '__module__', None),
+        getattr(target, '__qualname__', None) or repr(target),
+    )))
+
+    if code is None:
+        return name, '', 0
+
+    return name, code.co_filename, code.co_firstlineno
+
+
+def enable_stall_detector(*, threshold: float) -> None:
+    # Times every callback the event loops run, the ones that hold the loop
+    #   for longer than the threshold in seconds are described and recorded
+    #   in the monitor of their loop, traced or not. It costs two reads of
+    #   the clock per callback, or nothing if the threshold is zero
+    global _STALL_THRESHOLD  # pylint: disable=global-statement
+
+    if threshold < 0.0:
+        raise ValueError(
+            f'Expected a non-negative threshold, got: {threshold}'
+        )
+
+    _STALL_THRESHOLD = to_nanoseconds(threshold)
+    run_handle: Callable[[asyncio.Handle], None] = \
+        _run_handle if _STALL_THRESHOLD else _RUN_HANDLE
+    asyncio.Handle._run = run_handle  # type: ignore
+
+
+def is_skew(snapshot: LoopSnapshot) -> bool:
+    return snapshot.block_duration_ratio > 1.0 + LOOP_SKEW_TOLERANCE
+
+
+def get_loop_monitor() -> Optional[LoopMonitor]:
+    # Monitor of the running loop, there is none when the coroutine is
+    #   driven by something else than asyncio
+    loop: Optional[asyncio.AbstractEventLoop] = \
+        asyncio._get_running_loop()  # pylint: disable=protected-access
+    if loop is None:
+        return None
+
+    try:
+        monitor: LoopMonitor = _MONITORS[loop]
+    except KeyError:
+        if not _MONITORS and CONFIG.stall_threshold:
+            enable_stall_detector(threshold=CONFIG.stall_threshold)
+
+        monitor = _MONITORS[loop] = LoopMonitor(loop)
+
+    return monitor
+
+
+def _get_code(coroutine: Any) -> Any:
+    return getattr(coroutine, 'cr_code', None) \
+        or getattr(coroutine, 'gi_code', None)
+
+
+def _run_handle(handle: asyncio.Handle) -> None:
+    start: int = get_monotonic_time_ns()
+    _RUN_HANDLE(handle)
+    duration: int = get_monotonic_time_ns() - start
+
+    if duration >= _STALL_THRESHOLD:
+        # Only while some transaction on the loop is interested in them
+        monitor: Optional[LoopMonitor] = \
+            _MONITORS.get(handle._loop)  # type: ignore
+        if monitor is not None and monitor.transactions:
+            monitor.record_stall(
+                handle._callback,  # type: ignore
+                start,
+                duration,
+            )
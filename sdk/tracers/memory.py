@@ -0,0 +1,9 @@
+# Standard library
+import tracemalloc
+
+
+def enable_memory_tracking() -> None:
+    # Once started, tracemalloc slows down every allocation of the process,
+    #   traced or not. Frames only read its counters, never take snapshots
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
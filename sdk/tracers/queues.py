@@ -0,0 +1,238 @@
+# Standard library
+from collections import (
+    OrderedDict,
+)
+import heapq
+import itertools
+import threading
+from typing import (
+    Dict,
+    List,
+    Tuple,
+)
+
+# Local libraries
+from tracers.constants import (
+    AGGREGATE_SIZE,
+    LOOP_SKEW_SIZE,
+    LOOP_STALL_SIZE,
+)
+from tracers.containers import (
+    DaemonResult,
+    QueueCounters,
+)
+from tracers.recorder import (
+    EVENTS,
+    Recorder,
+)
+
+# Overflow policies
+POLICY_DROP_NEWEST: str = 'drop-newest'
+POLICY_DROP_OLDEST: str = 'drop-oldest'
+POLICY_KEEP_SLOWEST: str = 'keep-slowest'
+POLICIES: Tuple[str, ...] = (
+    POLICY_DROP_NEWEST,
+    POLICY_DROP_OLDEST,
+    POLICY_KEEP_SLOWEST,
+)
+
+
+def get_gc_time(result: DaemonResult) -> int:
+    # Nanoseconds, zero if garbage collections were not recorded
+    return result.stack.get_collections_time()
+
+
+def get_initiator(result: DaemonResult) -> int:
+    return result.stack.functions[0]
+
+
+def get_outcome(result: DaemonResult) -> str:
+    # How the root frame ended: return, exception or cancel
+    return EVENTS[result.stack.events[-1]]
+
+
+def get_size(result: DaemonResult) -> int:
+    return get_stack_size(result.stack) \
+        + LOOP_SKEW_SIZE * len(result.skews) \
+        + LOOP_STALL_SIZE * len(result.stalls)
+
+
+def get_stack_size(stack: Recorder) -> int:
+    # Estimated bytes of a recorder and its branches
+    return sum(
+        column.itemsize * len(column)
+        for column in (
+            stack.collections,
+            stack.cpu_times,
+            stack.events,
+            stack.functions,
+            stack.levels,
+            stack.memory_peaks,
+            stack.memory_sizes,
+            stack.suspended_times,
+            stack.timestamps,
+        )
+        if column is not None
+    ) + AGGREGATE_SIZE * (
+        len(stack.aggregates)
+        + len(stack.generators)
+        + sum(map(len, stack.buckets.values()))
+    ) + sum(map(get_stack_size, stack.iterate_branches()))
+
+
+def get_total_time(result: DaemonResult) -> int:
+    # Nanoseconds
+    return result.stack.timestamps[-1] - result.stack.timestamps[0]
+
+
+# Thread-safe FIFO of results bounded by items and estimated bytes
+class ResultsQueue:
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int,
+        max_items: int,
+        policy: str,
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f'Expected one of {POLICIES}, got: {policy}')
+
+        self.bytes: int = 0
+        self.counter: 'itertools.count[int]' = itertools.count()
+        self.dropped_bytes: int = 0
+        self.dropped_items: int = 0
+        self.items: 'OrderedDict[int, Tuple[DaemonResult, int]]' = \
+            OrderedDict()
+        self.lock: threading.Lock = threading.Lock()
+        self.max_bytes: int = max_bytes
+        self.max_items: int = max_items
+        self.policy: str = policy
+        # initiator -> heap of (total time, item id), lazily cleaned up
+        self.slowest: Dict[int, List[Tuple[int, int]]] = {}
+        # initiator -> number of queued items
+        self.slowest_items: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def drop(self, item_id: int) -> None:
+        self.dropped_bytes += self.remove(item_id)
+        self.dropped_items += 1
+
+    def get_counters(self) -> QueueCounters:
+        with self.lock:
+            return QueueCounters(
+                dropped_bytes=self.dropped_bytes,
+                dropped_items=self.dropped_items,
+            )
+
+    def get_fastest(self, initiator: int) -> Tuple[int, int]:
+        heap: List[Tuple[int, int]] = self.slowest[initiator]
+        while heap[0][1] not in self.items:
+            heapq.heappop(heap)
+
+        return heap[0]
+
+    def is_full(self, size: int) -> bool:
+        return bool(self.items) and (
+            len(self.items) + 1 > self.max_items
+            or self.bytes + size > self.max_bytes
+        )
+
+    def make_room(self, result: DaemonResult, size: int) -> bool:
+        if self.policy == POLICY_DROP_NEWEST:
+            return False
+
+        if self.policy == POLICY_DROP_OLDEST:
+            while self.is_full(size):
+                self.drop(next(iter(self.items)))
+            return True
+
+        # Evict the fastest transaction of the same initiator,
+        #   or of the most frequent initiator if this one is not queued yet
+        initiator: int = get_initiator(result)
+        total_time: int = get_total_time(result)
+        while self.is_full(size):
+            if initiator in self.slowest:
+                fastest_time, fastest_id = self.get_fastest(initiator)
+                if fastest_time >= total_time:
+                    return False
+            else:
+                _, fastest_id = self.get_fastest(max(
+                    self.slowest_items,
+                    key=self.slowest_items.__getitem__,
+                ))
+
+            self.drop(fastest_id)
+
+        return True
+
+    def pop(
+        self,
+        *,
+        max_bytes: int,
+        max_items: int,
+    ) -> Tuple[DaemonResult, ...]:
+        # Oldest results first, at least one if the queue is not empty
+        results: List[DaemonResult] = []
+        results_bytes: int = 0
+
+        with self.lock:
+            for result, size in self.items.values():
+                if results and (
+                    len(results) == max_items
+                    or results_bytes + size > max_bytes
+                ):
+                    break
+
+                results.append(result)
+                results_bytes += size
+
+            for _ in results:
+                self.remove(next(iter(self.items)))
+
+        return tuple(results)
+
+    def remove(self, item_id: int) -> int:
+        result, size = self.items.pop(item_id)
+        self.bytes -= size
+
+        if self.policy == POLICY_KEEP_SLOWEST:
+            initiator: int = get_initiator(result)
+            heap: List[Tuple[int, int]] = self.slowest[initiator]
+
+            self.slowest_items[initiator] -= 1
+            if not self.slowest_items[initiator]:
+                del self.slowest[initiator]
+                del self.slowest_items[initiator]
+            elif len(heap) > 2 * self.slowest_items[initiator]:
+                # Too many removed items linger in the heap, compact it
+                heap[:] = [entry for entry in heap if entry[1] in self.items]
+                heapq.heapify(heap)
+
+        return size
+
+    def put(self, result: DaemonResult) -> bool:
+        size: int = get_size(result)
+
+        with self.lock:
+            if self.is_full(size) and not self.make_room(result, size):
+                self.dropped_bytes += size
+                self.dropped_items += 1
+                return False
+
+            item_id: int = next(self.counter)
+            self.bytes += size
+            self.items[item_id] = (result, size)
+
+            if self.policy == POLICY_KEEP_SLOWEST:
+                initiator: int = get_initiator(result)
+                heapq.heappush(
+                    self.slowest.setdefault(initiator, []),
+                    (get_total_time(result), item_id),
+                )
+                self.slowest_items[initiator] = \
+                    self.slowest_items.get(initiator, 0) + 1
+
+        return True
@@ -0,0 +1,587 @@
+# Standard library
+from array import array
+import time
+import tracemalloc
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+)
+
+# Local libraries
+from tracers.containers import (
+    Frame,
+)
+
+# Events are stored as a single byte in the recorder
+#   Every call is closed by a return, an exception or a cancellation
+EVENT_CALL: int = 0
+EVENT_RETURN: int = 1
+EVENT_EXCEPTION: int = 2
+EVENT_CANCEL: int = 3
+EVENTS: Dict[int, str] = {
+    EVENT_CALL: 'call',
+    EVENT_RETURN: 'return',
+    EVENT_EXCEPTION: 'exception',
+    EVENT_CANCEL: 'cancel',
+}
+
+
+# Positions in the aggregates of consecutive equal calls,
+#   buckets of fast calls have a count, a sum and the sums of their CPU
+#   time, suspended time and allocated bytes
+AGGREGATE_COUNT: int = 0
+AGGREGATE_SUM: int = 1
+AGGREGATE_MIN: int = 2
+AGGREGATE_MAX: int = 3
+BUCKET_CPU: int = 2
+BUCKET_SUSPENDED: int = 3
+BUCKET_MEMORY: int = 4
+
+# Positions in the records of garbage collections
+COLLECTION_TIMESTAMP: int = 0
+COLLECTION_GENERATION: int = 1
+COLLECTION_DURATION: int = 2
+COLLECTION_COLLECTED: int = 3
+COLLECTION_FUNCTION: int = 4
+COLLECTION_SIZE: int = 5
+
+# Positions in the records of generators
+GENERATOR_RETURN: int = 0
+GENERATOR_PARENT: int = 1
+GENERATOR_RESUMES: int = 2
+GENERATOR_ITEMS: int = 3
+GENERATOR_LIFETIME: int = 4
+GENERATOR_TIME: int = 5
+
+# Python < 3.9 can not reset the peak, frames then peak at their sizes
+RESET_PEAK: Optional[Callable[[], None]] = getattr(
+    tracemalloc, 'reset_peak', None,
+)
+
+
+# Append-only, columnar storage for the frames of a transaction
+#   Every event is appended in O(1) to a set of typed arrays,
+#   functions are stored by their id in the process-wide registry and
+#   timestamps as integer nanoseconds since the recorder was created
+#
+# Consecutive calls to the same leaf function at the same level are
+#   collapsed on the fly into the first one. Its return is moved to the
+#   return of the last one, so timestamps keep growing, and the aggregates
+#   table keeps [count, sum, min, max] by the index of its call event. The
+#   sum, not the timestamps, is the time of the calls
+#
+# Leaf calls faster than their min_duration are not kept as frames, their
+#   count and time are added to a bucket of their parent instead, kept by
+#   the index of its call event and then by function. Calls whose own
+#   calls all went to their bucket are still kept as frames
+#
+# Optionally, the CPU time of the thread is recorded next to every event,
+#   as nanoseconds since the recorder was created too. In async code it
+#   includes whatever ran in the loop while a frame was awaiting
+#
+# Optionally too, the nanoseconds that an async transaction spent
+#   suspended so far are recorded next to every event, so the time that
+#   frames ran on the loop can be told apart from the time they awaited
+#
+# Optionally, garbage collections that paused the transaction are kept in
+#   a flat array of [timestamp, generation, duration, collected, function]
+#   records, where function is the innermost frame open at the time
+#
+# Frames closed by an exception or a cancellation keep the registered
+#   name of its type, by the index of their closing event. They are never
+#   collapsed nor summarized in a bucket
+#
+# Optionally, the bytes traced by tracemalloc are recorded next to every
+#   event, with the peak they reached since the previous event. Peaks of
+#   events that are not kept are carried over to the next one
+#
+# Every resume of a generator is a call to its function, nested in the
+#   frame that resumed it, and the generators table keeps [return index,
+#   parent call index, resumes, items, lifetime, time] by the index of the
+#   call event of the first one. Later resumes with the same parent are
+#   linked to the first one by the index of their call event, and stand
+#   for it as the parent of other frames. Those that are leaves are folded
+#   into it, their time is added to its own but its return is not moved.
+#   The others are kept as frames so their own frames keep a parent
+#
+# Tasks spawned inside the transaction record into recorders of their own,
+#   branches with the same options and epochs, kept by the index of the
+#   call event of the frame that was open when they first recorded. Every
+#   branch has a task id, 0 is the task that owns the transaction. Frames
+#   that spawned tasks are never collapsed, summarized in a bucket nor
+#   folded into other frames
+class Recorder:
+
+    __slots__ = (
+        'aggregates',
+        'branches',
+        'buckets',
+        'collections',
+        'cpu_epoch',
+        'cpu_times',
+        'epoch',
+        'events',
+        'exceptions',
+        'functions',
+        'generators',
+        'levels',
+        'memory_peak',
+        'memory_peaks',
+        'memory_sizes',
+        'open_calls',
+        'recorded',
+        'resumes',
+        'suspended',
+        'suspended_times',
+        'task',
+        'timestamps',
+    )
+
+    def __init__(
+        self,
+        *,
+        cpu_time: bool = False,
+        gc_time: bool = False,
+        memory: bool = False,
+        suspended_time: bool = False,
+    ) -> None:
+        self.aggregates: Dict[int, List[int]] = {}
+        self.branches: Dict[int, List['Recorder']] = {}
+        self.buckets: Dict[int, Dict[int, List[int]]] = {}
+        self.collections: 'Optional[array[int]]' = \
+            array('q') if gc_time else None
+        self.cpu_epoch: int = time.thread_time_ns() if cpu_time else 0
+        self.cpu_times: 'Optional[array[int]]' = \
+            array('q') if cpu_time else None
+        self.epoch: int = time.perf_counter_ns()
+        self.events: 'array[int]' = array('B')
+        self.exceptions: Dict[int, int] = {}
+        self.functions: 'array[int]' = array('I')
+        self.generators: Dict[int, List[int]] = {}
+        self.levels: 'array[int]' = array('H')
+        self.memory_peak: int = 0
+        self.memory_peaks: 'Optional[array[int]]' = \
+            array('q') if memory else None
+        self.memory_sizes: 'Optional[array[int]]' = \
+            array('q') if memory else None
+        self.open_calls: List[int] = []
+        self.recorded: int = 0
+        self.resumes: Dict[int, int] = {}
+        self.suspended: int = 0
+        self.suspended_times: 'Optional[array[int]]' = \
+            array('q') if suspended_time else None
+        self.task: int = 0
+        self.timestamps: 'array[int]' = array('q')
+
+    def __getitem__(self, index: int) -> Frame:
+        return Frame(
+            cpu_time=(
+                None if self.cpu_times is None else self.cpu_times[index]
+            ),
+            event=EVENTS[self.events[index]],
+            function=self.functions[index],
+            level=self.levels[index],
+            memory_peak=(
+                None if self.memory_peaks is None
+                else self.memory_peaks[index]
+            ),
+            memory_size=(
+                None if self.memory_sizes is None
+                else self.memory_sizes[index]
+            ),
+            suspended_time=(
+                None if self.suspended_times is None
+                else self.suspended_times[index]
+            ),
+            timestamp=self.timestamps[index],
+        )
+
+    def __iter__(self) -> Iterator[Frame]:
+        return map(self.__getitem__, range(len(self.events)))
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def branch(self, task: int) -> 'Recorder':
+        # Recorder of a task spawned while the innermost frame was open
+        branch: Recorder = Recorder(
+            cpu_time=self.cpu_times is not None,
+            gc_time=self.collections is not None,
+            memory=self.memory_sizes is not None,
+            suspended_time=self.suspended_times is not None,
+        )
+        branch.cpu_epoch = self.cpu_epoch
+        branch.epoch = self.epoch
+        branch.task = task
+
+        try:
+            self.branches[self.open_calls[-1]].append(branch)
+        except KeyError:
+            self.branches[self.open_calls[-1]] = [branch]
+
+        return branch
+
+    def collapse(
+        self,
+        function: int,
+        level: int,
+        timestamp: int,
+        cpu_time: int,
+        memory_size: int,
+        memory_peak: int,
+    ) -> bool:
+        # [call, return] of a previous sibling followed by the pending call
+        index: int = len(self.events) - 3
+        if index < 0:
+            return False
+
+        events = self.events
+        functions = self.functions
+        levels = self.levels
+        timestamps = self.timestamps
+
+        if functions[index + 2] != function \
+                or functions[index] != function \
+                or events[index + 2] != EVENT_CALL \
+                or events[index + 1] != EVENT_RETURN \
+                or functions[index + 1] != function \
+                or levels[index] != level \
+                or levels[index + 2] != level \
+                or index in self.branches:
+            return False
+
+        duration: int = timestamp - timestamps[index + 2]
+
+        try:
+            aggregate = self.aggregates[index]
+        except KeyError:
+            previous: int = timestamps[index + 1] - timestamps[index]
+            aggregate = self.aggregates[index] = \
+                [1, previous, previous, previous]
+
+        aggregate[AGGREGATE_COUNT] += 1
+        aggregate[AGGREGATE_SUM] += duration
+        if duration < aggregate[AGGREGATE_MIN]:
+            aggregate[AGGREGATE_MIN] = duration
+        if duration > aggregate[AGGREGATE_MAX]:
+            aggregate[AGGREGATE_MAX] = duration
+
+        # The previous sibling now stands for both
+        self.move_bucket(index + 2, index)
+        self.merge(index + 1, timestamp, cpu_time, memory_size, memory_peak)
+        timestamps[index + 1] = timestamp
+
+        return True
+
+    def bucket(
+        self,
+        call: int,
+        function: int,
+        timestamp: int,
+        cpu_time: int,
+        memory_size: int,
+        memory_peak: int,
+    ) -> bool:
+        # Only leaf calls that have a parent can go to a bucket, calls with
+        #   a bucket of their own are kept so their fast calls are not lost
+        if call != len(self.events) - 1 \
+                or not self.open_calls \
+                or call in self.buckets:
+            return False
+
+        try:
+            bucket = self.buckets[self.open_calls[-1]]
+        except KeyError:
+            bucket = self.buckets[self.open_calls[-1]] = {}
+
+        try:
+            aggregate = bucket[function]
+        except KeyError:
+            aggregate = bucket[function] = [0, 0, 0, 0, 0]
+
+        aggregate[AGGREGATE_COUNT] += 1
+        aggregate[AGGREGATE_SUM] += timestamp - self.timestamps[call]
+        if self.cpu_times is not None:
+            aggregate[BUCKET_CPU] += cpu_time - self.cpu_times.pop()
+        if self.suspended_times is not None:
+            aggregate[BUCKET_SUSPENDED] += \
+                self.suspended - self.suspended_times.pop()
+        if self.memory_sizes is not None \
+                and self.memory_peaks is not None:
+            aggregate[BUCKET_MEMORY] += memory_size - self.memory_sizes.pop()
+            self.memory_peak = \
+                max(self.memory_peak, self.memory_peaks.pop(), memory_peak)
+
+        # Forget the pending call
+        self.events.pop()
+        self.functions.pop()
+        self.levels.pop()
+        self.timestamps.pop()
+
+        return True
+
+    def count_events(self) -> int:
+        # Events that were recorded, including collapsed and bucketed calls,
+        #   the resumes folded into the frame of their generator and the
+        #   events of the branches, one per task that was spawned
+        return self.recorded + sum(
+            branch.count_events() for branch in self.iterate_branches()
+        )
+
+    def fold(
+        self,
+        frame: int,
+        call: int,
+        timestamp: int,
+        cpu_time: int,
+        memory_size: int,
+        memory_peak: int,
+    ) -> bool:
+        # Only linked resumes that are leaves
+        if call != len(self.events) - 1 or self.resumes.get(call) != frame:
+            return False
+
+        del self.resumes[call]
+        generator = self.generators[frame]
+        generator[GENERATOR_RESUMES] += 1
+        self.move_bucket(call, frame)
+        generator[GENERATOR_TIME] += self.merge(
+            generator[GENERATOR_RETURN],
+            timestamp, cpu_time, memory_size, memory_peak,
+        )
+
+        return True
+
+    def get_collections_time(self) -> int:
+        # Nanoseconds the transaction was paused by garbage collections,
+        #   including the ones that its branches triggered
+        if self.collections is None:
+            return 0
+
+        return sum(self.collections[COLLECTION_DURATION::COLLECTION_SIZE]) \
+            + sum(map(Recorder.get_collections_time, self.iterate_branches()))
+
+    def get_count(self, index: int) -> int:
+        # Number of calls that the call event at index stands for
+        try:
+            return self.aggregates[index][AGGREGATE_COUNT]
+        except KeyError:
+            return 1
+
+    def get_duration(self, call: int, returned: int) -> int:
+        # Nanoseconds of the frame, with the calls collapsed into it and
+        #   the resumes folded into it
+        try:
+            return self.aggregates[call][AGGREGATE_SUM]
+        except KeyError:
+            pass
+
+        try:
+            return self.generators[call][GENERATOR_TIME]
+        except KeyError:
+            return self.timestamps[returned] - self.timestamps[call]
+
+    def get_parent(self) -> int:
+        # Call index of the innermost open frame, or -1
+        #   A linked resume stands for the first one of its generator
+        if not self.open_calls:
+            return -1
+
+        parent: int = self.open_calls[-1]
+
+        return self.resumes.get(parent, parent)
+
+    def iterate_branches(self) -> Iterator['Recorder']:
+        # Direct branches only, by the order of their frames
+        for index in sorted(self.branches):
+            yield from self.branches[index]
+
+    def link(self, frame: int) -> None:
+        # The pending call of a later resume of the generator at frame
+        try:
+            generator = self.generators[frame]
+        except KeyError:
+            return
+
+        if generator[GENERATOR_PARENT] == self.get_parent():
+            self.resumes[len(self.events)] = frame
+
+    def merge(
+        self,
+        returned: int,
+        timestamp: int,
+        cpu_time: int,
+        memory_size: int,
+        memory_peak: int,
+    ) -> int:
+        # Forget the pending call, its deltas are added to the frame closed
+        #   by the event at returned and its duration is returned
+        self.events.pop()
+        self.functions.pop()
+        self.levels.pop()
+        duration: int = timestamp - self.timestamps.pop()
+        if self.cpu_times is not None:
+            self.cpu_times[returned] += cpu_time - self.cpu_times.pop()
+        if self.suspended_times is not None:
+            self.suspended_times[returned] += \
+                self.suspended - self.suspended_times.pop()
+        if self.memory_sizes is not None \
+                and self.memory_peaks is not None:
+            self.memory_sizes[returned] += \
+                memory_size - self.memory_sizes.pop()
+            # The peak before the pending call happened out of the frame
+            self.memory_peak = max(self.memory_peak, self.memory_peaks.pop())
+            self.memory_peaks[returned] = \
+                max(self.memory_peaks[returned], memory_peak)
+
+        return duration
+
+    def move_bucket(self, call: int, frame: int) -> None:
+        # Fast calls of the pending call at call, that is about to be
+        #   merged, are added to the bucket of the frame at frame
+        try:
+            bucket = self.buckets.pop(call)
+        except KeyError:
+            return
+
+        try:
+            target = self.buckets[frame]
+        except KeyError:
+            self.buckets[frame] = bucket
+            return
+
+        for function, aggregate in bucket.items():
+            try:
+                total = target[function]
+            except KeyError:
+                target[function] = aggregate
+            else:
+                total[:] = map(sum, zip(total, aggregate))
+
+    def prune(self) -> None:
+        # Once the transaction finished, branches of tasks that still have
+        #   frames open are left out of it
+        for index, branches in tuple(self.branches.items()):
+            branches[:] = [
+                branch for branch in branches if not branch.open_calls
+            ]
+            if branches:
+                for branch in branches:
+                    branch.prune()
+            else:
+                del self.branches[index]
+
+    def record_collection(
+        self,
+        timestamp: int,
+        generation: int,
+        duration: int,
+        collected: int,
+    ) -> None:
+        # Collections outside of every frame are not part of the transaction
+        if self.collections is not None and self.open_calls:
+            self.collections.extend((
+                timestamp - self.epoch,
+                generation,
+                duration,
+                collected,
+                self.functions[self.open_calls[-1]],
+            ))
+
+    def record_generator(self, frame: int, items: int, lifetime: int) -> None:
+        # Items are counted as they are yielded, the lifetime in nanoseconds
+        #   is known once the generator is finished
+        try:
+            generator = self.generators[frame]
+        except KeyError:
+            return
+
+        generator[GENERATOR_ITEMS] = items
+        generator[GENERATOR_LIFETIME] = lifetime
+
+    def record(
+        self,
+        event: int,
+        function: int,
+        level: int,
+        timestamp: int,
+        min_duration: int = 0,
+        generator: int = -1,
+    ) -> None:
+        # Callers pass the clock as is, it's made relative here
+        #   Resumes of a generator, except the first one, are recorded with
+        #   the index of its call event, and all of them are closed with it
+        timestamp -= self.epoch
+        self.recorded += 1
+
+        cpu_times = self.cpu_times
+        cpu_time: int = 0
+        if cpu_times is not None:
+            cpu_time = time.thread_time_ns() - self.cpu_epoch
+
+        memory_sizes = self.memory_sizes
+        memory_size: int = 0
+        memory_peak: int = 0
+        if memory_sizes is not None:
+            memory_size, memory_peak = tracemalloc.get_traced_memory()
+            if RESET_PEAK is None:
+                memory_peak = memory_size
+            else:
+                RESET_PEAK()
+
+        call: int = -1
+        if event == EVENT_CALL:
+            if generator >= 0:
+                self.link(generator)
+            self.open_calls.append(len(self.events))
+        elif self.open_calls:
+            call = self.open_calls.pop()
+
+            # Frames that failed are always kept as they are, on their own,
+            #   and so are the ones that spawned tasks
+            if event != EVENT_RETURN:
+                self.resumes.pop(call, None)
+            elif call in self.branches:
+                pass
+            elif generator >= 0:
+                if self.fold(
+                    generator, call, timestamp, cpu_time,
+                    memory_size, memory_peak,
+                ):
+                    return
+            else:
+                if min_duration \
+                        and timestamp - self.timestamps[call] < min_duration \
+                        and self.bucket(
+                            call, function, timestamp, cpu_time,
+                            memory_size, memory_peak,
+                        ):
+                    return
+
+                if self.collapse(
+                    function, level, timestamp, cpu_time,
+                    memory_size, memory_peak,
+                ):
+                    return
+
+        self.events.append(event)
+        self.functions.append(function)
+        self.levels.append(level)
+        self.timestamps.append(timestamp)
+        if cpu_times is not None:
+            cpu_times.append(cpu_time)
+        if self.suspended_times is not None:
+            self.suspended_times.append(self.suspended)
+        if memory_sizes is not None and self.memory_peaks is not None:
+            memory_sizes.append(memory_size)
+            self.memory_peaks.append(max(memory_peak, self.memory_peak))
+            self.memory_peak = 0
+        if generator >= 0 and generator == call:
+            # The first resume of a generator is closed
+            self.generators[call] = [
+                len(self.events) - 1, self.get_parent(), 1, 0, 0,
+                timestamp - self.timestamps[call],
+            ]
@@ -0,0 +1,54 @@
+# Standard library
+import os
+import threading
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+)
+
+# Local libraries
+from tracers.utils import (
+    get_function_id,
+)
+
+# Private constants
+_FUNCTIONS_IDS: Dict[str, int] = {}
+_FUNCTIONS_LOCK: threading.Lock = threading.Lock()
+
+# Process-wide table of function names, indexed by their integer id
+FUNCTIONS: List[str] = []
+
+
+def get_function_name(function_id: int) -> str:
+    return FUNCTIONS[function_id]
+
+
+def reset_after_fork() -> None:
+    # The lock may have been held by another thread at the time of the fork
+    global _FUNCTIONS_LOCK  # pylint: disable=global-statement
+
+    _FUNCTIONS_LOCK = threading.Lock()
+
+
+def register_function(function: Callable[..., Any]) -> int:
+    return register_function_name(get_function_id(function))
+
+
+def register_function_name(name: str) -> int:
+    function_id: int
+
+    try:
+        function_id = _FUNCTIONS_IDS[name]
+    except KeyError:
+        with _FUNCTIONS_LOCK:
+            function_id = _FUNCTIONS_IDS.setdefault(name, len(FUNCTIONS))
+            if function_id == len(FUNCTIONS):
+                FUNCTIONS.append(name)
+
+    return function_id
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_after_fork)
@@ -0,0 +1,108 @@
+# Standard library
+import atexit
+import contextlib
+import os
+import queue
+import threading
+from typing import (
+    Optional,
+)
+
+# Local libraries
+from tracers.analyzers import (
+    analyze_collections,
+    analyze_fan_outs,
+    analyze_loop_snapshots,
+    analyze_stack,
+)
+from tracers.constants import (
+    LOGGER_DAEMON,
+    REPORTS_QUEUE_SIZE,
+    REPORTS_SHUTDOWN_TIMEOUT,
+)
+from tracers.containers import (
+    Report,
+)
+from tracers.contextvars import (
+    LOGGER,
+)
+
+# Private constants
+_REPORTS_DROPPED: int = 0
+_REPORTS_QUEUE: 'queue.Queue[Optional[Report]]' = \
+    queue.Queue(maxsize=REPORTS_QUEUE_SIZE)
+_WORKER: Optional[threading.Thread] = None
+_WORKER_LOCK: threading.Lock = threading.Lock()
+
+
+def worker() -> None:
+    global _REPORTS_DROPPED  # pylint: disable=global-statement
+
+    # A None in the queue means that the worker must stop
+    for report in iter(_REPORTS_QUEUE.get, None):
+        if _REPORTS_DROPPED:
+            LOGGER_DAEMON.warning('Dropped reports: %s', _REPORTS_DROPPED)
+            _REPORTS_DROPPED = 0
+
+        LOGGER.set(report.logger)
+        analyze_stack(report.stack)
+        analyze_collections(report.stack)
+        analyze_fan_outs(report.stack)
+        analyze_loop_snapshots(
+            tuple(report.snapshots),
+            report.stack,
+            tuple(report.stalls),
+        )
+
+
+def reset_after_fork() -> None:
+    # The worker thread does not survive a fork, start from scratch
+    global _REPORTS_DROPPED, _REPORTS_QUEUE  # pylint: disable=global-statement
+    global _WORKER, _WORKER_LOCK  # pylint: disable=global-statement
+
+    _REPORTS_DROPPED = 0
+    _REPORTS_QUEUE = queue.Queue(maxsize=REPORTS_QUEUE_SIZE)
+    _WORKER = None
+    _WORKER_LOCK = threading.Lock()
+
+
+def send_report_to_worker(
+    *,
+    report: Report,
+) -> None:
+    global _REPORTS_DROPPED  # pylint: disable=global-statement
+
+    if _WORKER is None:
+        start_worker()
+
+    try:
+        _REPORTS_QUEUE.put_nowait(report)
+    except queue.Full:
+        # The request path never waits for the reports to be rendered
+        _REPORTS_DROPPED += 1
+
+
+def start_worker() -> None:
+    global _WORKER  # pylint: disable=global-statement
+
+    with _WORKER_LOCK:
+        if _WORKER is None:
+            _WORKER = threading.Thread(
+                daemon=True,
+                name='Tracers Reporter',
+                target=worker,
+            )
+            _WORKER.start()
+            atexit.register(stop_worker)
+
+
+def stop_worker() -> None:
+    # Render what is pending before the interpreter exits
+    if _WORKER is not None:
+        with contextlib.suppress(queue.Full):
+            _REPORTS_QUEUE.put(None, timeout=REPORTS_SHUTDOWN_TIMEOUT)
+        _WORKER.join(timeout=REPORTS_SHUTDOWN_TIMEOUT)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_after_fork)
@@ -0,0 +1,202 @@
+# Standard library
+import math
+import threading
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+# Local libraries
+from tracers.constants import (
+    RETENTION_BUCKETS,
+    RETENTION_BUCKETS_PER_OCTAVE,
+    RETENTION_DECAY_EVERY,
+    RETENTION_REFRESH_EVERY,
+    RETENTION_WARM_UP,
+)
+from tracers.containers import (
+    DaemonResult,
+    TransactionSummary,
+)
+from tracers.queues import (
+    get_gc_time,
+    get_initiator,
+    get_outcome,
+    get_total_time,
+)
+
+
+def get_bucket(total_time: int) -> int:
+    # Logarithmic buckets of microseconds, a few of them per power of two
+    microseconds: float = max(1.0, total_time / 1e3)
+
+    return min(
+        RETENTION_BUCKETS - 1,
+        int(RETENTION_BUCKETS_PER_OCTAVE * math.log2(microseconds)),
+    )
+
+
+def get_bucket_start(bucket: int) -> float:
+    # Nanoseconds
+    return math.pow(2.0, bucket / RETENTION_BUCKETS_PER_OCTAVE) * 1e3
+
+
+class InitiatorStats:
+
+    __slots__ = (
+        'count',
+        'fastest',
+        'gc_time',
+        'histogram',
+        'maximum',
+        'minimum',
+        'observations',
+        'rolling',
+        'slowest',
+        'threshold',
+        'total_time',
+    )
+
+    def __init__(self) -> None:
+        # Since the last flush
+        self.count: int = 0
+        self.gc_time: int = 0
+        self.histogram: Dict[int, int] = {}
+        self.total_time: int = 0
+
+        # Extremes since the last flush, their stacks are held back
+        #   unless they were kept already
+        self.fastest: Optional[DaemonResult] = None
+        self.maximum: float = -math.inf
+        self.minimum: float = math.inf
+        self.slowest: Optional[DaemonResult] = None
+
+        # Rolling estimate of the latency distribution, older
+        #   observations lose half their weight every now and then
+        self.observations: int = 0
+        self.rolling: List[float] = [0.0] * RETENTION_BUCKETS
+        self.threshold: float = 0.0
+
+    def observe(
+        self,
+        total_time: int,
+        gc_time: int,
+        bucket: int,
+        quantile: float,
+    ) -> None:
+        self.count += 1
+        self.gc_time += gc_time
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+        self.total_time += total_time
+
+        self.observations += 1
+        self.rolling[bucket] += 1.0
+
+        if self.observations % RETENTION_DECAY_EVERY == 0:
+            self.rolling = [weight / 2.0 for weight in self.rolling]
+
+        if self.observations % RETENTION_REFRESH_EVERY == 0:
+            self.threshold = self.get_quantile(quantile)
+
+    def get_quantile(self, quantile: float) -> float:
+        target: float = quantile * sum(self.rolling)
+
+        cumulative: float = 0.0
+        for bucket, weight in enumerate(self.rolling):
+            cumulative += weight
+            if weight and cumulative >= target:
+                return get_bucket_start(bucket)
+
+        return 0.0
+
+
+# Tail-based retention: only the slow transactions keep their stack, and
+#   the fastest and slowest since the last flush, so the server can still
+#   show its min/max views. Every transaction is folded into per-initiator
+#   counters and histograms. Failed and cancelled transactions are kept
+#   apart from the ones that returned, they are slower or faster for
+#   reasons of their own
+class Retention:
+
+    def __init__(self, *, quantile: float) -> None:
+        if not 0.0 <= quantile <= 1.0:
+            raise ValueError(
+                f'Expected a quantile in [0, 1], got: {quantile}'
+            )
+
+        # By initiator and outcome
+        self.initiators: Dict[Tuple[int, str], InitiatorStats] = {}
+        self.lock: threading.Lock = threading.Lock()
+        self.pending: int = 0
+        self.quantile: float = quantile
+
+    def __bool__(self) -> bool:
+        return self.pending > 0
+
+    def keep(self, result: DaemonResult) -> bool:
+        key: Tuple[int, str] = (get_initiator(result), get_outcome(result))
+        total_time: int = get_total_time(result)
+        bucket: int = get_bucket(total_time)
+
+        with self.lock:
+            try:
+                stats = self.initiators[key]
+            except KeyError:
+                stats = self.initiators[key] = InitiatorStats()
+
+            keep: bool = (
+                stats.observations < RETENTION_WARM_UP
+                or total_time >= stats.threshold
+            )
+
+            if total_time < stats.minimum:
+                stats.fastest = None if keep else result
+                stats.minimum = total_time
+            if total_time > stats.maximum:
+                stats.maximum = total_time
+                stats.slowest = None if keep else result
+            stats.observe(
+                total_time, get_gc_time(result), bucket, self.quantile,
+            )
+            self.pending += 1
+
+        return keep
+
+    def flush(
+        self,
+    ) -> Tuple[Tuple[DaemonResult, ...], Tuple[TransactionSummary, ...]]:
+        extremes: List[DaemonResult] = []
+        summaries: List[TransactionSummary] = []
+
+        with self.lock:
+            for (initiator, outcome), stats in self.initiators.items():
+                if stats.count:
+                    summaries.append(TransactionSummary(
+                        count=stats.count,
+                        gc_time=stats.gc_time,
+                        histogram=stats.histogram,
+                        initiator=initiator,
+                        outcome=outcome,
+                        total_time=stats.total_time,
+                    ))
+
+                    # The same transaction may be the fastest and slowest
+                    if stats.fastest is not None:
+                        extremes.append(stats.fastest)
+                    if stats.slowest not in (None, stats.fastest):
+                        extremes.append(stats.slowest)
+
+                    stats.count = 0
+                    stats.fastest = None
+                    stats.gc_time = 0
+                    stats.histogram = {}
+                    stats.maximum = -math.inf
+                    stats.minimum = math.inf
+                    stats.slowest = None
+                    stats.total_time = 0
+
+            self.pending = 0
+
+        return tuple(extremes), tuple(summaries)
@@ -0,0 +1,160 @@
+# Standard library
+import functools
+import random
+from typing import (
+    Dict,
+    List,
+    Tuple,
+)
+
+# Local libraries
+from tracers.config import (
+    CONFIG,
+)
+from tracers.constants import (
+    SAMPLING_BURST_SECONDS,
+    SAMPLING_CALIBRATION_CALLS,
+)
+from tracers.recorder import (
+    Recorder,
+)
+from tracers.utils import (
+    delta,
+    get_monotonic_time,
+)
+
+# Sampling policies
+POLICY_ALWAYS: str = 'always'
+POLICY_CPU_BUDGET: str = 'cpu-budget'
+POLICY_PROBABILITY: str = 'probability'
+POLICY_RATE: str = 'rate'
+POLICIES: Tuple[str, ...] = (
+    POLICY_ALWAYS,
+    POLICY_CPU_BUDGET,
+    POLICY_PROBABILITY,
+    POLICY_RATE,
+)
+
+
+@functools.lru_cache(maxsize=None)
+def get_event_cost() -> float:
+    # Measured once per process, when the first sampler that needs it is
+    #   built, which happens when the first function is decorated
+    # pylint: disable=import-outside-toplevel,cyclic-import
+    from tracers.function import measure_event_cost
+
+    return measure_event_cost(calls=SAMPLING_CALIBRATION_CALLS)
+
+
+# Decides once per root transaction if it is traced
+#   The base class traces everything
+class Sampler:
+
+    def account(self, stack: Recorder) -> None:
+        pass
+
+    def sample(self, initiator: int) -> bool:  # pylint: disable=no-self-use
+        return True
+
+
+class ProbabilitySampler(Sampler):
+
+    def __init__(self, *, probability: float) -> None:
+        if not 0.0 <= probability <= 1.0:
+            raise ValueError(
+                f'Expected a probability in [0, 1], got: {probability}'
+            )
+
+        self.probability: float = probability
+
+    def sample(self, initiator: int) -> bool:
+        return random.random() < self.probability
+
+
+# Token bucket per initiator, races between threads only make it generous
+class RateSampler(Sampler):
+
+    def __init__(self, *, per_second: float) -> None:
+        if per_second <= 0.0:
+            raise ValueError(f'Expected a positive rate, got: {per_second}')
+
+        self.buckets: Dict[int, List[float]] = {}
+        self.capacity: float = max(1.0, per_second * SAMPLING_BURST_SECONDS)
+        self.per_second: float = per_second
+
+    def sample(self, initiator: int) -> bool:
+        now: float = get_monotonic_time()
+
+        try:
+            bucket = self.buckets[initiator]
+        except KeyError:
+            # [tokens, last refill]
+            bucket = self.buckets.setdefault(initiator, [self.capacity, now])
+
+        bucket[0] = min(
+            self.capacity,
+            bucket[0] + self.per_second * delta(bucket[1], now),
+        )
+        bucket[1] = now
+
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            return True
+
+        return False
+
+
+# Token bucket of CPU seconds shared by all initiators
+#   Tracing costs are charged after the fact, proportional to the recorded
+#   events, so the measured overhead stays under the budget on average
+class CpuBudgetSampler(Sampler):
+
+    def __init__(self, *, budget: float) -> None:
+        if not 0.0 < budget <= 1.0:
+            raise ValueError(f'Expected a budget in (0, 1], got: {budget}')
+
+        self.budget: float = budget
+        self.capacity: float = budget * SAMPLING_BURST_SECONDS
+        self.event_cost: float = get_event_cost()
+        self.last_refill: float = get_monotonic_time()
+        self.tokens: float = self.capacity
+
+    def account(self, stack: Recorder) -> None:
+        self.tokens -= stack.count_events() * self.event_cost
+
+    def sample(self, initiator: int) -> bool:
+        now: float = get_monotonic_time()
+
+        self.tokens = min(
+            self.capacity,
+            self.tokens + self.budget * delta(self.last_refill, now),
+        )
+        self.last_refill = now
+
+        return self.tokens > 0.0
+
+
+def get_sampler(*, policy: str, value: float) -> Sampler:
+    if policy not in POLICIES:
+        raise ValueError(f'Expected one of {POLICIES}, got: {policy}')
+
+    sampler: Sampler
+    if policy == POLICY_CPU_BUDGET:
+        sampler = CpuBudgetSampler(budget=value)
+    elif policy == POLICY_PROBABILITY:
+        sampler = ProbabilitySampler(probability=value)
+    elif policy == POLICY_RATE:
+        sampler = RateSampler(per_second=value)
+    else:
+        sampler = Sampler()
+
+    return sampler
+
+
+@functools.lru_cache(maxsize=None)
+def get_default_sampler() -> Sampler:
+    # Shared by every trace() that does not bring its own sampler
+    return get_sampler(
+        policy=CONFIG.sampling_policy,
+        value=CONFIG.sampling_value,
+    )
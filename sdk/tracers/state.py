@@ -0,0 +1,65 @@
+# Standard library
+import logging
+import threading
+from typing import (
+    Any,
+    List,
+    Optional,
+)
+
+# Local libraries
+from tracers.recorder import (
+    Recorder,
+)
+
+
+# Everything a transaction needs, in a single object held by a ContextVar
+#   It's mutated in place by the task or thread that owns the transaction,
+#   other tasks and threads that inherit it never record into it nor change
+#   it. They are told apart with get_current_owner()
+#
+# Tasks spawned inside a transaction get a state of their own, a branch,
+#   that records into a branch of the recorder of the task that spawned
+#   them. Branches are listed in the state of the root of the transaction
+class State:
+
+    __slots__ = (
+        'base',
+        'branches',
+        'level',
+        'logger',
+        'owner',
+        'recorder',
+        'root',
+        'thread',
+        'tracing',
+    )
+
+    def __init__(
+        self,
+        *,
+        logger: Optional[logging.Logger],
+        owner: Optional[Any],
+        recorder: Optional[Recorder],
+        tracing: bool,
+    ) -> None:
+        # Level of the frame that spawned the task of a branch
+        self.base: int = 0
+        self.branches: List['State'] = []
+        self.level: int = 0
+        self.logger: Optional[logging.Logger] = logger
+        self.owner: Optional[Any] = owner
+        self.recorder: Optional[Recorder] = recorder
+        self.root: Optional['State'] = None
+        # Thread that made the state, the only one its branches come from
+        self.thread: int = threading.get_ident()
+        self.tracing: bool = tracing
+
+
+# Shared by every transaction that is not traced, it's never mutated
+UNTRACED: State = State(
+    logger=None,
+    owner=None,
+    recorder=None,
+    tracing=False,
+)
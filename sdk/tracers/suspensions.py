@@ -0,0 +1,46 @@
+# Standard library
+import time
+import types
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Generator,
+)
+
+# Local libraries
+from tracers.recorder import (
+    Recorder,
+)
+
+
+@types.coroutine
+def track_suspensions(
+    coroutine: Coroutine[Any, Any, Any],
+    recorder: Recorder,
+) -> Generator[Any, Any, Any]:
+    # Drives the root coroutine of a transaction step by step, like an
+    #   `await` would, and adds the time between steps to the recorder
+    #   Every frame of the transaction runs inside one of these steps,
+    #   so this is the only coroutine that needs to be driven
+    method: Callable[[Any], Any] = coroutine.send
+    argument: Any = None
+
+    while True:
+        try:
+            yielded: Any = method(argument)
+        except StopIteration as stop:
+            return stop.value
+
+        suspended_since: int = time.perf_counter_ns()
+        try:
+            argument = yield yielded
+        except GeneratorExit:
+            coroutine.close()
+            raise
+        except BaseException as exception:  # pylint: disable=broad-except
+            method, argument = coroutine.throw, exception
+        else:
+            method = coroutine.send
+        finally:
+            recorder.suspended += time.perf_counter_ns() - suspended_since
@@ -0,0 +1,305 @@
+# Standard library
+import asyncio
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+)
+
+# Third party libraries
+import aiohttp
+
+# Local libraries
+from tracers.analyzers import (
+    get_blocking_culprits,
+)
+from tracers.config import (
+    CONFIG,
+)
+from tracers.containers import (
+    DaemonResult,
+    QueueCounters,
+    TransactionSummary,
+)
+from tracers.graphql import (
+    GraphQLClient,
+)
+from tracers.queues import (
+    get_outcome,
+)
+from tracers.recorder import (
+    COLLECTION_FUNCTION,
+    COLLECTION_SIZE,
+    GENERATOR_ITEMS,
+    GENERATOR_LIFETIME,
+    GENERATOR_RESUMES,
+    GENERATOR_TIME,
+    Recorder,
+)
+from tracers.registry import (
+    get_function_name,
+)
+from tracers.utils import (
+    json_dumps,
+)
+
+
+async def request_server(
+    *,
+    client: GraphQLClient,
+    query: str,
+    variables: Dict[str, Any] = {},
+) -> Tuple[bool, str]:
+    msg: str
+    success: bool
+
+    # Timeouts and responses that are not JSON fail the upload too
+    try:
+        response = await client.execute(query=query, variables=variables)
+    except (
+        aiohttp.ClientError,
+        asyncio.TimeoutError,
+        ValueError,
+    ) as exception:
+        msg, success = str(exception) or repr(exception), False
+    else:
+        if response.get('errors'):
+            msg, success = json_dumps(response['errors']), False
+        else:
+            msg, success = '', True
+
+    return success, msg
+
+
+async def send_system_to_server(
+    *,
+    client: GraphQLClient,
+) -> Tuple[bool, str]:
+    return await request_server(
+        client=client,
+        query="""
+            mutation(
+                $systemId: String!
+            ) {
+                putSystem(
+                    systemId: $systemId
+                ) {
+                    success
+                }
+            }
+        """,
+        variables={
+            'systemId': CONFIG.system_id,
+        },
+    )
+
+
+def encode_stack(
+    stack: Recorder,
+    functions_ids: Dict[int, int],
+) -> Dict[str, Any]:
+    # Columns and tables of a recorder, its branches are encoded the same way
+    return {
+        # [call event index, count, sum, min, max] of collapsed calls, the
+        #   sum is their time, their return is the one of the last call
+        'aggregates': [
+            [index, *aggregate]
+            for index, aggregate in stack.aggregates.items()
+        ],
+        # [call event index, task, stack] of the tasks spawned while the
+        #   frame was open
+        'branches': [
+            [index, branch.task, encode_stack(branch, functions_ids)]
+            for index, branches in stack.branches.items()
+            for branch in branches
+        ],
+        # [call event index, function, count, sum, CPU sum,
+        #   suspended sum, allocated bytes]
+        'buckets': [
+            [index, functions_ids[function_id], *aggregate]
+            for index, bucket in stack.buckets.items()
+            for function_id, aggregate in bucket.items()
+        ],
+        # Only if the CPU time was recorded
+        **({} if stack.cpu_times is None else {
+            'cpu': stack.cpu_times.tolist(),
+        }),
+        'event': stack.events.tolist(),
+        # [closing event index, type] of the frames that raised
+        #   or were cancelled
+        'exceptions': [
+            [index, functions_ids[exception]]
+            for index, exception in stack.exceptions.items()
+        ],
+        # Only if garbage collections were recorded, [timestamp,
+        #   generation, duration, collected, function]
+        **({} if stack.collections is None else {
+            'gc': [
+                [
+                    *stack.collections[index:index + COLLECTION_FUNCTION],
+                    functions_ids[
+                        stack.collections[index + COLLECTION_FUNCTION]
+                    ],
+                ]
+                for index in range(
+                    0, len(stack.collections), COLLECTION_SIZE,
+                )
+            ],
+        }),
+        'function': [
+            functions_ids[function_id]
+            for function_id in stack.functions
+        ],
+        # [call event index, resumes, items, lifetime, time] of the
+        #   frames of generators, time includes the resumes folded into them
+        'generators': [
+            [
+                index,
+                generator[GENERATOR_RESUMES],
+                generator[GENERATOR_ITEMS],
+                generator[GENERATOR_LIFETIME],
+                generator[GENERATOR_TIME],
+            ]
+            for index, generator in stack.generators.items()
+        ],
+        'level': stack.levels.tolist(),
+        # Only if the traced memory was recorded
+        **({} if stack.memory_sizes is None else {
+            'memory': stack.memory_sizes.tolist(),
+        }),
+        **({} if stack.memory_peaks is None else {
+            'memoryPeak': stack.memory_peaks.tolist(),
+        }),
+        # [call event index, call event index of the first one] of
+        #   the resumes of generators that were kept as frames
+        'resumes': [
+            [index, frame] for index, frame in stack.resumes.items()
+        ],
+        # Only if the suspended time was recorded
+        **({} if stack.suspended_times is None else {
+            'suspended': stack.suspended_times.tolist(),
+        }),
+        'timestamp': stack.timestamps.tolist(),
+    }
+
+
+def encode_transactions(
+    results: Tuple[DaemonResult, ...],
+    summaries: Tuple[TransactionSummary, ...] = (),
+) -> Tuple[List[str], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    # Function names are sent once per batch in a string table,
+    #   frames reference them by their position in that table
+    functions: List[str] = []
+    functions_ids: Dict[int, int] = {}
+    transactions: List[Dict[str, Any]] = []
+
+    def add_functions(ids: Iterable[int]) -> None:
+        for function_id in set(ids) - functions_ids.keys():
+            functions_ids[function_id] = len(functions)
+            functions.append(get_function_name(function_id))
+
+    for result in results:
+        stack = result.stack
+
+        add_functions(get_stack_functions(stack))
+
+        transactions.append({
+            'initiator': functions_ids[stack.functions[0]],
+            'outcome': get_outcome(result),
+            'stack': json_dumps({
+                **encode_stack(stack, functions_ids),
+                # [function, skews of the event loop, blocked nanoseconds]
+                'culprits': [
+                    [functions_ids[function_id], *culprit]
+                    for function_id, culprit in get_blocking_culprits(
+                        stack, result.skews,
+                    ).items()
+                ],
+                # [timestamp, duration, callback, file, line] of the
+                #   callbacks that held the event loop for too long
+                'stalls': [
+                    [
+                        stall.timestamp - stack.epoch,
+                        stall.duration,
+                        stall.callback,
+                        stall.filename,
+                        stall.line,
+                    ]
+                    for stall in result.stalls
+                ],
+            }),
+            'totalTime': stack.timestamps[-1] - stack.timestamps[0],
+        })
+
+    add_functions(summary.initiator for summary in summaries)
+
+    return functions, transactions, [
+        {
+            'count': summary.count,
+            'gcTime': summary.gc_time,
+            'histogram': json_dumps(summary.histogram),
+            'initiator': functions_ids[summary.initiator],
+            'outcome': summary.outcome,
+            'totalTime': summary.total_time,
+        }
+        for summary in summaries
+    ]
+
+
+def get_stack_functions(stack: Recorder) -> Iterator[int]:
+    # Functions referenced by a recorder and its branches
+    yield from stack.functions
+    for bucket in stack.buckets.values():
+        yield from bucket
+    yield from stack.exceptions.values()
+    if stack.collections is not None:
+        yield from stack.collections[COLLECTION_FUNCTION::COLLECTION_SIZE]
+    for branch in stack.iterate_branches():
+        yield from get_stack_functions(branch)
+
+
+async def send_transactions_to_server(
+    *,
+    client: GraphQLClient,
+    dropped: QueueCounters,
+    results: Tuple[DaemonResult, ...],
+    summaries: Tuple[TransactionSummary, ...],
+) -> Tuple[bool, str]:
+    functions, transactions, summaries_ = \
+        encode_transactions(results, summaries)
+
+    return await request_server(
+        client=client,
+        query="""
+            mutation(
+                $droppedBytes: BigInt!
+                $droppedItems: BigInt!
+                $functions: [String!]!
+                $summaries: [TransactionSummaryInput!]!
+                $systemId: String!
+                $transactions: [TransactionInput!]!
+            ) {
+                putTransactions(
+                    droppedBytes: $droppedBytes
+                    droppedItems: $droppedItems
+                    functions: $functions
+                    summaries: $summaries
+                    systemId: $systemId
+                    transactions: $transactions
+                ) {
+                    success
+                }
+            }
+        """,
+        variables={
+            'droppedBytes': dropped.dropped_bytes,
+            'droppedItems': dropped.dropped_items,
+            'functions': functions,
+            'summaries': summaries_,
+            'systemId': CONFIG.system_id,
+            'transactions': transactions,
+        },
+    )
@@ -1,22 +1,21 @@
 # Standard library
 import asyncio
-import contextlib
-from contextvars import (
-    ContextVar,
-    Token,
-)
 from decimal import Decimal
+import inspect
 import json
 import threading
 import time
 from typing import (
     Any,
     Callable,
-    Iterator,
+    Optional,
     Type,
 )
 
 # Local libraries
+from tracers.constants import (
+    NANOSECONDS_PER_SECOND,
+)
 from tracers.containers import (
     DaemonResult,
     Frame,
@@ -27,15 +26,6 @@ from tracers.contextvars import (
 )
 
 
-@contextlib.contextmanager
-def condition() -> Iterator[threading.Event]:
-    instance: threading.Event = threading.Event()
-    try:
-        yield instance
-    finally:
-        instance.clear()
-
-
 def delta(start_timestamp: float, end_timestamp: float) -> float:
     return end_timestamp - start_timestamp
 
@@ -50,6 +40,23 @@ def divide(
         on_zero_denominator if denominator == 0.0 else numerator / denominator
 
 
+def get_current_owner() -> Any:
+    # The task that runs the caller, or its thread when there is none
+    #   Tasks and threads that share a context are told apart this way
+    loop = asyncio._get_running_loop()  # pylint: disable=protected-access
+    task: Optional['asyncio.Task[Any]'] = \
+        None if loop is None else asyncio.current_task(loop)
+
+    return threading.get_ident() if task is None else task
+
+
+def get_current_task() -> Optional['asyncio.Task[Any]']:
+    # Cheaper than asyncio.current_task() when there is no running loop
+    loop = asyncio._get_running_loop()  # pylint: disable=protected-access
+
+    return None if loop is None else asyncio.current_task(loop)
+
+
 def get_function_id(function: Callable[..., Any]) -> str:
     # Adding decorators to a function modify its metadata
     #   Fortunately functools' wrapped functions keep a reference to the parent
@@ -58,7 +65,13 @@ def get_function_id(function: Callable[..., Any]) -> str:
 
     module: str = function.__module__
     name: str = function.__name__
-    prefix = 'async ' * asyncio.iscoroutinefunction(function)
+    prefix: str
+    if inspect.isasyncgenfunction(function):
+        prefix = 'async generator '
+    elif inspect.isgeneratorfunction(function):
+        prefix = 'generator '
+    else:
+        prefix = 'async ' * asyncio.iscoroutinefunction(function)
 
     if module not in {'__main__'}:
         return f'{prefix}{module}.{name}'
@@ -70,13 +83,9 @@ def get_monotonic_time() -> float:
     return time.clock_gettime(time.CLOCK_MONOTONIC)
 
 
-@contextlib.contextmanager
-def increase_counter(contextvar: ContextVar[int]) -> Iterator[None]:
-    token: Token[int] = contextvar.set(contextvar.get() + 1)
-    try:
-        yield
-    finally:
-        contextvar.reset(token)
+# Integer nanoseconds of the clock that frames are timed with
+#   An alias saves a function call per recorded event
+get_monotonic_time_ns: Callable[[], int] = time.perf_counter_ns
 
 
 def json_dumps(element: object) -> str:
@@ -121,3 +130,11 @@ def on_error(
         return wrapper
 
     return decorator
+
+
+def to_nanoseconds(seconds: float) -> int:
+    return round(NANOSECONDS_PER_SECOND * seconds)
+
+
+def to_seconds(nanoseconds: int) -> float:
+    return nanoseconds / NANOSECONDS_PER_SECOND
@@ -41,6 +41,13 @@ class PutSystem(graphene.Mutation):  # type: ignore
 
 class PutSystemTransactions(graphene.Mutation):  # type: ignore
     class Arguments:
+        dropped_bytes = server.api.schema.types.BigInt(default_value=0)
+        dropped_items = server.api.schema.types.BigInt(default_value=0)
+        functions = graphene.List(graphene.String, required=True)
+        summaries = graphene.List(
+            server.api.schema.types.TransactionSummaryInput,
+            default_value=[],
+        )
         system_id = graphene.String(required=True)
         transactions = graphene.List(
             server.api.schema.types.TransactionInput,
@@ -53,11 +60,19 @@ class PutSystemTransactions(graphene.Mutation):  # type: ignore
     async def mutate(
         self,
         info: graphql.execution.base.ResolveInfo,
+        dropped_bytes: int,
+        dropped_items: int,
+        functions: Tuple[str, ...],
+        summaries: Tuple[server.api.schema.types.TransactionSummaryInput, ...],
         system_id: str,
         transactions: Tuple[server.api.schema.types.TransactionInput, ...],
     ) -> 'PutSystemTransactions':
         success = await server.domain.system.put_system_measure__transactions(
             claims=info.context['request'].state.verified_claims,
+            dropped_bytes=dropped_bytes,
+            dropped_items=dropped_items,
+            functions=functions,
+            summaries=summaries,
             system_id=system_id,
             transactions=transactions,
         )
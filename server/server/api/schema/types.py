@@ -22,6 +22,25 @@ import server.config
 # pylint: disable=too-few-public-methods
 
 
+# GraphQL's Int is 32 bits, nanoseconds need more
+class BigInt(graphene.Scalar):  # type: ignore
+
+    @staticmethod
+    def serialize(data: Any) -> int:
+        return int(data)
+
+    @staticmethod
+    def parse_literal(node: object) -> Any:
+        if isinstance(node, graphql.language.ast.IntValue):
+            return BigInt.parse_value(node.value)
+
+        return None
+
+    @staticmethod
+    def parse_value(value: Any) -> int:
+        return int(value)
+
+
 class DateTime(graphene.Scalar):  # type: ignore
 
     @staticmethod
@@ -76,18 +95,45 @@ class JSONString(graphene.Scalar):  # type: ignore
 
 
 class TransactionInput(graphene.InputObjectType):  # type: ignore
-    initiator = graphene.String()
+    # Position of the initiator in the batch functions table
+    initiator = graphene.Int()
+    # return, exception or cancel, older clients do not send it
+    outcome = graphene.String()
     stack = JSONString()
-    total_time = graphene.Decimal()
+    # Nanoseconds
+    total_time = BigInt()
+
+
+class TransactionSummaryInput(graphene.InputObjectType):  # type: ignore
+    count = graphene.Int()
+    # Nanoseconds paused by garbage collections
+    gc_time = BigInt()
+    # Number of transactions per logarithmic bucket of microseconds
+    histogram = JSONString()
+    # Position of the initiator in the batch functions table
+    initiator = graphene.Int()
+    # return, exception or cancel, older clients do not send it
+    outcome = graphene.String()
+    # Nanoseconds
+    total_time = BigInt()
 
 
 class Transaction(graphene.ObjectType):  # type: ignore
+    count = graphene.Int()
+    # Nanoseconds paused by garbage collections
+    gc_time = BigInt()
+    histogram = JSONString()
     initiator = graphene.String()
     max_stack = JSONString()
-    max_total_time = graphene.Decimal()
+    # Nanoseconds
+    max_total_time = BigInt()
     min_stack = JSONString()
-    min_total_time = graphene.Decimal()
+    # Nanoseconds
+    min_total_time = BigInt()
+    outcome = graphene.String()
     stamp = DateTime()
+    # Nanoseconds
+    total_time = BigInt()
 
 
 TRANSACTION_INTERVAL = graphene.Enum('TransactionInterval', [
@@ -25,6 +25,7 @@ import tracers.function
 import server.api.schema.mutation
 import server.api.schema.query
 import server.authc
+import server.compression
 import server.utils.aio
 
 # Implementation
@@ -58,6 +59,11 @@ SERVER = Starlette(
                 '/api',
             ),
         ),
+        # Inside of the authentication, so only clients that hold a token
+        #   get their requests decompressed
+        Middleware(
+            cls=server.compression.DecompressionMiddleware,
+        ),
     ],
     routes=[
         Route(
@@ -0,0 +1,176 @@
+# Standard library
+import io
+from typing import (
+    Callable,
+    Dict,
+    Tuple,
+    Type,
+)
+import zlib
+
+# Third party libraries
+import starlette.responses
+import starlette.types
+
+# Local libraries
+import server.config
+import server.utils.aio
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _gzip_decompress(data: bytes, max_length: int) -> bytes:
+    # A single member, as the SDK sends it
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    body: bytes = decompressor.decompress(data, max_length)
+
+    if not decompressor.eof:
+        if len(body) >= max_length:
+            raise OverflowError(f'Decompressed body over {max_length} bytes')
+        raise ValueError('Truncated gzip body')
+
+    return body
+
+
+def _zstd_decompress(data: bytes, max_length: int) -> bytes:
+    # Frames without a content size in the header are allowed too
+    body: bytearray = bytearray()
+    decompressor = zstandard.ZstdDecompressor()
+
+    with decompressor.stream_reader(io.BytesIO(data)) as reader:
+        while True:
+            chunk: bytes = reader.read(max_length + 1 - len(body))
+            if not chunk:
+                return bytes(body)
+
+            body += chunk
+            if len(body) > max_length:
+                raise OverflowError(
+                    f'Decompressed body over {max_length} bytes',
+                )
+
+
+DECOMPRESSORS: Dict[str, Callable[[bytes, int], bytes]] = {
+    'gzip': _gzip_decompress,
+}
+# Raised by the decompressors on corrupt bodies
+DECOMPRESSION_ERRORS: Tuple[Type[Exception], ...] = (
+    OSError,
+    ValueError,
+    zlib.error,
+)
+if zstandard:
+    DECOMPRESSORS['zstd'] = _zstd_decompress
+    DECOMPRESSION_ERRORS += (zstandard.ZstdError,)
+
+
+class DecompressionMiddleware:
+
+    def __init__(self, app: starlette.types.ASGIApp):
+        self.app: starlette.types.ASGIApp = app
+
+    async def __call__(
+        self,
+        scope: starlette.types.Scope,
+        receive: starlette.types.Receive,
+        send: starlette.types.Send,
+    ) -> None:
+        encoding: str = 'identity'
+        if scope['type'] == 'http':
+            encoding = dict(scope['headers']).get(
+                b'content-encoding', b'identity',
+            ).decode('latin-1').strip().lower()
+
+        if encoding == 'identity':
+            await self.app(scope, receive, send)
+            return
+
+        response: starlette.responses.Response
+        if not scope.get('state', {}).get('verified_claims'):
+            # Only authenticated clients get to spend our CPU on this
+            response = starlette.responses.PlainTextResponse(
+                content='Compressed requests must be authenticated',
+                status_code=401,
+            )
+        elif encoding in DECOMPRESSORS:
+            try:
+                body: bytes = await server.utils.aio.unblock(
+                    DECOMPRESSORS[encoding],
+                    await _read_body(
+                        receive, server.config.REQUEST_MAX_BYTES,
+                    ),
+                    server.config.REQUEST_MAX_DECOMPRESSED_BYTES,
+                )
+            except OverflowError as exception:
+                response = starlette.responses.PlainTextResponse(
+                    content=str(exception),
+                    status_code=413,
+                )
+            except DECOMPRESSION_ERRORS as exception:
+                response = starlette.responses.PlainTextResponse(
+                    content=f'Invalid {encoding} body: {exception}',
+                    status_code=400,
+                )
+            else:
+                # Downstream applications see a plain request
+                await self.app(
+                    {
+                        **scope,
+                        'headers': [
+                            (name, value)
+                            for name, value in scope['headers']
+                            if name not in {
+                                b'content-encoding', b'content-length',
+                            }
+                        ],
+                    },
+                    _replay_body(body, receive),
+                    send,
+                )
+                return
+        else:
+            response = starlette.responses.PlainTextResponse(
+                content=f'Unsupported content encoding: {encoding}',
+                status_code=415,
+            )
+        await response(scope, receive, send)
+
+
+async def _read_body(
+    receive: starlette.types.Receive,
+    max_length: int,
+) -> bytes:
+    body: bytearray = bytearray()
+
+    more_body: bool = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if len(body) > max_length:
+            raise OverflowError(f'Body over {max_length} bytes')
+
+    return bytes(body)
+
+
+def _replay_body(
+    body: bytes,
+    receive: starlette.types.Receive,
+) -> starlette.types.Receive:
+    replayed: bool = False
+
+    async def replay() -> starlette.types.Message:
+        nonlocal replayed
+
+        if replayed:
+            # Let downstream applications wait for the disconnection
+            return await receive()
+
+        replayed = True
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    return replay
@@ -31,5 +31,8 @@ MEASURE_INTERVALS: Tuple[int, ...] = (
     604800,  # 1 week
     2592000,  # 1 month
 )
+# Compressed requests, as sent and once decompressed
+REQUEST_MAX_BYTES: int = 16 * 1024 * 1024
+REQUEST_MAX_DECOMPRESSED_BYTES: int = 128 * 1024 * 1024
 SESSION_DURATION_SECONDS: int = 3600
 TTL_PER_SECOND: int = 60
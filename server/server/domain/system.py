@@ -2,7 +2,14 @@
 from datetime import (
     datetime,
 )
+from itertools import (
+    chain,
+)
 from typing import (
+    Any,
+    Dict,
+    Iterator,
+    NamedTuple,
     Tuple,
 )
 
@@ -20,6 +27,64 @@ import server.dal.aws.dynamodb
 import server.utils.aio
 
 
+# Private constants
+_OUTCOME_RETURN: str = 'return'
+_SUMMARY_HISTOGRAM_PREFIX: str = 'summary_histogram_'
+
+
+class Transaction(NamedTuple):
+    initiator: str
+    outcome: str
+    stack: Dict[str, Any]
+    # Nanoseconds
+    total_time: int
+
+
+@tracers.function.trace()
+def _decode_transaction(
+    *,
+    functions: Tuple[str, ...],
+    transaction: server.api.schema.types.TransactionInput,
+) -> Transaction:
+    # Frames reference the functions table of the batch,
+    #   keep only the names this stack needs next to it
+    stack_functions_ids: Dict[int, int] = {}
+    for function_id in _get_stack_functions(transaction.stack):
+        stack_functions_ids.setdefault(function_id, len(stack_functions_ids))
+
+    return Transaction(
+        initiator=functions[transaction.initiator],
+        outcome=transaction.outcome or _OUTCOME_RETURN,
+        stack={
+            **_remap_stack(transaction.stack, stack_functions_ids),
+            # Culprits are always functions of some frame
+            'culprits': [
+                [stack_functions_ids[function_id], *culprit]
+                for function_id, *culprit
+                in transaction.stack.get('culprits', [])
+            ],
+            'functions': [
+                functions[function_id] for function_id in stack_functions_ids
+            ],
+        },
+        total_time=transaction.total_time,
+    )
+
+
+def _get_stack_functions(stack: Dict[str, Any]) -> Iterator[int]:
+    # Functions referenced by a stack and the stacks of its branches
+    return chain(
+        stack['function'],
+        (bucket[1] for bucket in stack.get('buckets', [])),
+        (collection[-1] for collection in stack.get('gc', [])),
+        (exception[1] for exception in stack.get('exceptions', [])),
+        chain.from_iterable(
+            _get_stack_functions(branch)
+            for _, _, branch in stack.get('branches', [])
+        ),
+    )
+
+
 @tracers.function.trace()
 async def _get_intervals() -> Tuple[Tuple[int, str], ...]:
     now: float = datetime.utcnow().timestamp()
@@ -33,6 +98,42 @@ async def _get_intervals() -> Tuple[Tuple[int, str], ...]:
     return stamps
 
 
+def _remap_stack(
+    stack: Dict[str, Any],
+    stack_functions_ids: Dict[int, int],
+) -> Dict[str, Any]:
+    # Stacks of branches are remapped to the same functions table
+    return {
+        **stack,
+        # Only if tasks were spawned
+        **({} if 'branches' not in stack else {
+            'branches': [
+                [index, task, _remap_stack(branch, stack_functions_ids)]
+                for index, task, branch in stack['branches']
+            ],
+        }),
+        'buckets': [
+            [index, stack_functions_ids[function_id], *aggregate]
+            for index, function_id, *aggregate in stack.get('buckets', [])
+        ],
+        'exceptions': [
+            [index, stack_functions_ids[function_id]]
+            for index, function_id in stack.get('exceptions', [])
+        ],
+        'function': [
+            stack_functions_ids[function_id]
+            for function_id in stack['function']
+        ],
+        # Only if garbage collections were recorded
+        **({} if 'gc' not in stack else {
+            'gc': [
+                [*collection, stack_functions_ids[function_id]]
+                for *collection, function_id in stack['gc']
+            ],
+        }),
+    }
+
+
 @tracers.function.trace()
 async def get_system_measure__transaction(
     *,
@@ -54,13 +155,24 @@ async def get_system_measure__transaction(
         range_key=range_key,
     )
 
+    # Items may only have summaries, or only stacks if uploaded
+    #   by an SDK that keeps every transaction
     return tuple(server.api.schema.types.Transaction(
+        count=result.get('summary_count'),
+        gc_time=result.get('summary_gc_time'),
+        histogram={
+            attribute[len(_SUMMARY_HISTOGRAM_PREFIX):]: count
+            for attribute, count in result.items()
+            if attribute.startswith(_SUMMARY_HISTOGRAM_PREFIX)
+        },
         initiator=result['range_key']['initiator'],
-        max_stack=result['max_stack'],
-        max_total_time=result['max_total_time'],
-        min_stack=result['min_stack'],
-        min_total_time=result['min_total_time'],
+        max_stack=result.get('max_stack'),
+        max_total_time=result.get('max_total_time'),
+        min_stack=result.get('min_stack'),
+        min_total_time=result.get('min_total_time'),
+        outcome=result['range_key'].get('outcome', _OUTCOME_RETURN),
         stamp=result['range_key']['stamp'],
+        total_time=result.get('summary_total_time'),
     ) for result in results)
 
 
@@ -89,14 +201,59 @@ async def put_tenant__system(
     ))
 
 
+@tracers.function.trace()
+async def put_system_measure__dropped(
+    *,
+    dropped_bytes: int,
+    dropped_items: int,
+    hash_key: str,
+    interval: int,
+    stamp: str,
+) -> bool:
+    return await server.dal.aws.dynamodb.put((
+        server.dal.aws.dynamodb.Request(
+            expires_in=interval * server.config.TTL_PER_SECOND,
+            expression_attribute_values={
+                ':dropped_bytes': dropped_bytes,
+                ':dropped_items': dropped_items,
+            },
+            hash_key=hash_key,
+            range_key=await server.dal.aws.dynamodb.serialize_key({
+                'type': 'dropped',
+                'stamp': stamp,
+            }),
+            update_expression={
+                'ADD': {
+                    'dropped_bytes :dropped_bytes',
+                    'dropped_items :dropped_items',
+                },
+                'SET': set(),
+            },
+        ),
+    ))
+
+
 @tracers.function.trace()
 async def put_system_measure__transactions(
     *,
     claims: server.authc.VerifiedClaims,
+    dropped_bytes: int,
+    dropped_items: int,
+    functions: Tuple[str, ...],
+    summaries: Tuple[server.api.schema.types.TransactionSummaryInput, ...],
     system_id: str,
     transactions: Tuple[server.api.schema.types.TransactionInput, ...],
 ) -> bool:
     intervals = await _get_intervals()
+    hash_keys: Tuple[str, ...] = tuple([
+        await server.dal.aws.dynamodb.serialize_key({
+            'interval': str(interval),
+            'system_id': system_id,
+            'tenant_id': claims.tenant_id,
+            'type': 'system_measure',
+        })
+        for interval, _ in intervals
+    ])
 
     return all(await server.utils.aio.materialize([
         put_system_measure__transaction(
@@ -105,38 +262,112 @@ async def put_system_measure__transactions(
             stamp=stamp,
             transaction=transaction,
         )
-        for transaction in transactions
-        for interval, stamp in intervals
-        for hash_key in [await server.dal.aws.dynamodb.serialize_key({
-            'interval': str(interval),
-            'system_id': system_id,
-            'tenant_id': claims.tenant_id,
-            'type': 'system_measure',
-        })]
+        for encoded_transaction in transactions
+        for transaction in [_decode_transaction(
+            functions=functions,
+            transaction=encoded_transaction,
+        )]
+        for (interval, stamp), hash_key in zip(intervals, hash_keys)
+    ] + [
+        put_system_measure__summary(
+            hash_key=hash_key,
+            initiator=functions[summary.initiator],
+            interval=interval,
+            stamp=stamp,
+            summary=summary,
+        )
+        for summary in summaries
+        for (interval, stamp), hash_key in zip(intervals, hash_keys)
+    ] + [
+        put_system_measure__dropped(
+            dropped_bytes=dropped_bytes,
+            dropped_items=dropped_items,
+            hash_key=hash_key,
+            interval=interval,
+            stamp=stamp,
+        )
+        for (interval, stamp), hash_key in zip(intervals, hash_keys)
+        if dropped_items
     ]))
 
 
+@tracers.function.trace()
+async def put_system_measure__summary(
+    *,
+    hash_key: str,
+    initiator: str,
+    interval: int,
+    stamp: str,
+    summary: server.api.schema.types.TransactionSummaryInput,
+) -> bool:
+    # Buckets are validated as integers before becoming attribute names
+    histogram: Dict[int, int] = {
+        int(bucket): int(count)
+        for bucket, count in summary.histogram.items()
+    }
+
+    return await server.dal.aws.dynamodb.put((
+        server.dal.aws.dynamodb.Request(
+            expires_in=interval * server.config.TTL_PER_SECOND,
+            expression_attribute_values={
+                ':count': summary.count,
+                # Older clients do not send it
+                ':gc_time': summary.gc_time or 0,
+                ':total_time': summary.total_time,
+                **{
+                    f':histogram_{bucket}': count
+                    for bucket, count in histogram.items()
+                },
+            },
+            hash_key=hash_key,
+            # Failed and cancelled transactions are summarized apart
+            range_key=await server.dal.aws.dynamodb.serialize_key({
+                'type': 'transaction',
+                'initiator': initiator,
+                'outcome': summary.outcome or _OUTCOME_RETURN,
+                'stamp': stamp,
+            }),
+            update_expression={
+                'ADD': {
+                    'summary_count :count',
+                    'summary_gc_time :gc_time',
+                    'summary_total_time :total_time',
+                    *(
+                        f'{_SUMMARY_HISTOGRAM_PREFIX}{bucket}'
+                        f' :histogram_{bucket}'
+                        for bucket in histogram
+                    ),
+                },
+                'SET': set(),
+            },
+        ),
+    ))
+
+
 @tracers.function.trace()
 async def put_system_measure__transaction(
     *,
     hash_key: str,
     interval: int,
     stamp: str,
-    transaction: server.api.schema.types.TransactionInput,
+    transaction: Transaction,
 ) -> bool:
+    # Failed and cancelled transactions keep their own min/max stacks
     range_key: str = await server.dal.aws.dynamodb.serialize_key({
         'type': 'transaction',
         'initiator': transaction.initiator,
+        'outcome': transaction.outcome,
         'stamp': stamp,
     })
 
     return await server.dal.aws.dynamodb.put((
-        # Initialize the item if it does not exist
+        # Initialize the stacks if they do not exist,
+        #   the item may already exist with only summaries
         server.dal.aws.dynamodb.Request(
             allow_condition_failure=True,
             condition_expression=(
-                Attr('hash_key').not_exists()
-                & Attr('range_key').not_exists()
+                Attr('min_total_time').not_exists()
+                & Attr('max_total_time').not_exists()
             ),
             expires_in=interval * server.config.TTL_PER_SECOND,
             expression_attribute_values={